@@ -0,0 +1,121 @@
+# backend.py — async client for the video-creation backend (FastAPI or standin_server.py)
+# - Minimal HTTP/1.1 client on asyncio streams: no extra dependency, and cancelling the
+#   awaiting task aborts the request mid-flight (socket closed in `finally`)
+# - Endpoints: POST /jobs, POST /jobs/{id}/stages/{stage}, POST /jobs/{id}/cancel,
+#              POST /stages/{stage}/batch (several jobs' stage requests in one call)
+# - Calls go through ratelimit.call_with_retry under the stage's upstream token bucket
+# - A request body can also be a sized async iterable of byte blocks (uploads.FileSlice): it is written block
+#   by block with backpressure, so large uploads stream from disk
+
+import asyncio, json, os, time
+from urllib.parse import urlsplit
+
+from ratelimit import call_with_retry
+
+DEFAULT_URL = os.environ.get("STORYMORPH_BACKEND_URL", "")
+REQUEST_TIMEOUT = 600.0
+
+
+class BackendError(Exception):
+    def __init__(self, status, body, headers=None):
+        super().__init__(f"HTTP {status}: {body[:200]!r}")
+        self.status = status; self.body = body; self.headers = headers or {}
+
+
+async def _read_body(reader, headers):
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                await reader.readline(); break
+            chunks.append(await reader.readexactly(size)); await reader.readline()
+        return b"".join(chunks)
+    if "content-length" in headers:
+        return await reader.readexactly(int(headers["content-length"]))
+    return await reader.read()
+
+
+async def http_request(method, url, body=None, headers=None, timeout=REQUEST_TIMEOUT):
+    """Returns (status, headers, body_bytes). Headers are lower-cased."""
+    u = urlsplit(url)
+    port = u.port or (443 if u.scheme == "https" else 80)
+    path = (u.path or "/") + (f"?{u.query}" if u.query else "")
+    if isinstance(body, (dict, list)):
+        body = json.dumps(body).encode(); headers = {"Content-Type": "application/json", **(headers or {})}
+    body = body or b""
+    streamed = not isinstance(body, (bytes, bytearray))
+
+    async def _do():
+        reader, writer = await asyncio.open_connection(u.hostname, port, ssl=(u.scheme == "https") or None)
+        try:
+            head = [f"{method} {path} HTTP/1.1", f"Host: {u.netloc}", "Connection: close",
+                    f"Content-Length: {len(body)}"] + [f"{k}: {v}" for k, v in (headers or {}).items()]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + (b"" if streamed else body))
+            await writer.drain()
+            if streamed:
+                blocks = body.__aiter__()
+                try:
+                    async for block in blocks:
+                        writer.write(block); await writer.drain()
+                finally:
+                    await blocks.aclose()
+            line = await reader.readline()
+            if not line: raise ConnectionResetError("connection closed before the response")
+            status = int(line.split()[1])
+            resp_headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line: break
+                k, _, v = line.partition(":"); resp_headers[k.strip().lower()] = v.strip()
+            return status, resp_headers, await _read_body(reader, resp_headers)
+        finally:
+            writer.close()   # also runs on CancelledError -> connection torn down immediately
+
+    return await asyncio.wait_for(_do(), timeout)
+
+
+class BackendClient:
+    def __init__(self, base_url=DEFAULT_URL):
+        self.base_url = base_url.rstrip("/")
+
+    async def _json(self, method, path, payload=None, timeout=REQUEST_TIMEOUT):
+        status, headers, body = await http_request(method, self.base_url + path, payload, timeout=timeout)
+        if status >= 400: raise BackendError(status, body, headers)
+        return json.loads(body or b"{}")
+
+    async def create_job(self, prompt):
+        res = await call_with_retry("backend", lambda: self._json("POST", "/jobs", {"prompt": prompt}))
+        return res["job_id"]
+
+    async def run_stage(self, job_id, stage, payload=None, upstream="backend"):
+        return await call_with_retry(
+            upstream, lambda: self._json("POST", f"/jobs/{job_id}/stages/{stage}", payload or {}))
+
+    async def run_stage_batch(self, stage, items, upstream="backend", on_round_trip=None):
+        """items: [(job_id, prompt)] -> per-item result dicts, or BackendError for items that failed.
+        on_round_trip(seconds) gets the time of the request that succeeded (no limiter waits or retries)."""
+        payload = {"jobs": [{"job_id": j, "prompt": p} for j, p in items]}
+
+        async def attempt():
+            t0 = time.monotonic()
+            res = await self._json("POST", f"/stages/{stage}/batch", payload)
+            if on_round_trip: on_round_trip(time.monotonic() - t0)
+            return res
+        res = await call_with_retry(upstream, attempt)
+        by_id = {r["job_id"]: r for r in res["results"]}
+        out = []
+        for job_id, _ in items:
+            r = by_id.get(job_id)
+            out.append(BackendError(r.get("status", 500) if r else 500, (r or {}).get("error", "missing result").encode())
+                       if r is None or "error" in r else r)
+        return out
+
+    async def cancel(self, job_id, timeout=None):
+        # Not rate limited: a cancel must never queue behind the work it cancels
+        return await self._json("POST", f"/jobs/{job_id}/cancel", {}, timeout=timeout or REQUEST_TIMEOUT)
+
+
+def default_client():
+    # GUIs talk to the backend only when STORYMORPH_BACKEND_URL is set; otherwise stages are simulated
+    return BackendClient(DEFAULT_URL) if DEFAULT_URL else None
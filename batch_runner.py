@@ -0,0 +1,179 @@
+# batch_runner.py — headless batch runner (no GUI imports)
+# - Reads prompts (plain text, one per line, or JSONL with a "prompt" field)
+# - Runs them through pipeline.run_job with bounded concurrency
+# - Streams step / progress / log events as JSON lines to stdout or a file
+# - Prints a per-stage throughput / latency summary at the end (plus per-destination upload throughput)
+# - Optionally exports log lines to rotating, compressed JSONL files (--log-dir, log_sink.py)
+#
+#   python batch_runner.py prompts.txt --concurrency 4 --output events.jsonl --time-scale 0.1
+
+import argparse, asyncio, json, signal, sys, threading, time
+
+import pipeline
+from backend import BackendClient, DEFAULT_URL
+from cancellation import CancelToken
+from eta import DurationModel
+from events import EventBus, StepFinished, LogRecord, TransferProgress
+from log_sink import LogSink
+from uploads import Uploader, DESTINATIONS, UPLOAD_URL
+
+
+def read_prompts(path):
+    prompts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"): continue
+            if line.startswith("{"):
+                line = json.loads(line)["prompt"]
+            prompts.append(line)
+    return prompts
+
+
+# ---------------- Stats ----------------
+def _pct(sorted_vals, q):
+    if not sorted_vals: return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))]
+
+class StageStats:
+    def __init__(self, model=None, sizes=None):
+        self.model = model; self.sizes = sizes or {}
+        self.latencies = {k: [] for k in pipeline.STEP_KEYS}
+        self.failures = {k: 0 for k in pipeline.STEP_KEYS}
+        self.jobs_ok = self.jobs_failed = self.jobs_cancelled = 0
+        self.dropped = 0
+        self.batching = None
+        self.uploads = {}   # destination -> [files, bytes, sum of MB/s]
+
+    def observe(self, ev):
+        if isinstance(ev, TransferProgress) and ev.done:
+            u = self.uploads.setdefault(ev.dest, [0, 0, 0.0])
+            u[0] += 1; u[1] += ev.total; u[2] += ev.rate / 1e6
+        if not isinstance(ev, StepFinished): return
+        if ev.ok:
+            self.latencies[ev.step].append(ev.elapsed)
+            if self.model: self.model.observe(ev.step, ev.elapsed, self.sizes.get(ev.job))
+        elif ev.status == StepFinished.FAILED: self.failures[ev.step] += 1
+
+    def summary(self, wall):
+        lines = [f"jobs: {self.jobs_ok} ok, {self.jobs_failed} failed, {self.jobs_cancelled} cancelled in {wall:.2f}s "
+                 f"({(self.jobs_ok / wall if wall else 0):.2f} jobs/s), {self.dropped} progress events dropped",
+                 f"{'stage':<22}{'done':>6}{'fail':>6}{'thru/s':>9}{'mean':>8}{'p50':>8}{'p95':>8}{'max':>8}"]
+        for step in pipeline.STEPS:
+            lat = sorted(self.latencies[step["key"]]); n = len(lat)
+            lines.append(f"{step['title']:<22}{n:>6}{self.failures[step['key']]:>6}"
+                         f"{(n / wall if wall else 0):>9.2f}{(sum(lat) / n if n else 0):>8.2f}"
+                         f"{_pct(lat, .50):>8.2f}{_pct(lat, .95):>8.2f}{(lat[-1] if n else 0):>8.2f}")
+        if self.batching:
+            b = self.batching
+            lines.append(f"story batching: {b['items']} prompts in {b['batches']} calls (avg {b['avg_batch']}, "
+                         f"max {b['max_batch']}), avg wait {b['avg_wait_ms']} ms, {b['round_trips_saved']} round trips "
+                         f"saved, {b['items_per_s']} prompts/s vs "
+                         + (f"{b['unbatched_items_per_s']} unbatched (gain x{b['gain']})" if b["gain"] is not None
+                            else "unbatched not measured"))
+        for dest, (n, size, mbps) in sorted(self.uploads.items()):
+            lines.append(f"upload {dest}: {n} files, {size / 1e6:.1f} MB, avg {mbps / n:.1f} MB/s per file")
+        return "\n".join(lines)
+
+
+# ---------------- Runner ----------------
+def _write_events(sub, out, stats, done, sink=None):
+    # Bus subscriber on its own thread so slow output never stalls the pipeline
+    while True:
+        sub.wait(0.1)
+        for ev in sub.drain():
+            stats.observe(ev)
+            out.write(json.dumps(ev.to_dict(), separators=(",", ":")) + "\n")
+            if sink is not None and isinstance(ev, LogRecord): sink.emit(ev.ts, ev.level, ev.msg, ev.step, ev.job)
+        if done.is_set() and not len(sub): break
+    out.flush()
+
+
+async def run_batch(prompts, out, concurrency=4, time_scale=1.0, fail_step=None, model=None,
+                    backend=None, stop=None, story_batch=0, story_batch_wait=0.05, sink=None, uploader=None):
+    stats = StageStats(model, {i: len(p) for i, p in enumerate(prompts)})
+    bus = EventBus(); sub = bus.subscribe(maxsize=65536)
+    done = threading.Event()
+    writer = threading.Thread(target=_write_events, args=(sub, out, stats, done, sink), daemon=True)
+    writer.start()
+    sem = asyncio.Semaphore(max(1, concurrency))
+    batcher = pipeline.story_batcher(backend, story_batch, story_batch_wait) if backend and story_batch > 1 else None
+
+    # With batching, Story Creation has its own limit (two batches' worth) and the concurrency slot is only taken
+    # after it, so prompts waiting for a slot still fill the batch instead of trickling out a few at a time
+    story_sem = asyncio.Semaphore(2 * story_batch) if batcher else None
+
+    async def one(job, prompt):
+        if stop is not None and stop.is_set(): status = StepFinished.CANCELLED
+        elif batcher: status = await pipeline.run_job(job, prompt, bus, time_scale=time_scale, fail_step=fail_step,
+                                                      stop=stop, backend=backend, batcher=batcher, uploader=uploader,
+                                                      story_slot=story_sem, slot=sem)
+        else:
+            async with sem:
+                if stop is not None and stop.is_set(): status = StepFinished.CANCELLED
+                else: status = await pipeline.run_job(job, prompt, bus, time_scale=time_scale, fail_step=fail_step,
+                                                      stop=stop, backend=backend, uploader=uploader)
+        if status == StepFinished.DONE: stats.jobs_ok += 1
+        elif status == StepFinished.CANCELLED: stats.jobs_cancelled += 1
+        else: stats.jobs_failed += 1
+
+    t0 = time.monotonic()
+    await asyncio.gather(*(one(i, p) for i, p in enumerate(prompts)))
+    wall = time.monotonic() - t0
+    done.set(); writer.join()
+    stats.dropped = sub.dropped
+    stats.batching = batcher.metrics() if batcher else None
+    return stats, wall
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run prompts through the video pipeline without a GUI.")
+    ap.add_argument("prompts", help="prompt file: one prompt per line, or JSONL with a 'prompt' field")
+    ap.add_argument("-c", "--concurrency", type=int, default=4, help="jobs in flight at once (default 4)")
+    ap.add_argument("-o", "--output", default="-", help="JSONL event output file ('-' = stdout)")
+    ap.add_argument("--time-scale", type=float, default=1.0,
+                    help="multiplier for simulated step durations (0 = as fast as possible)")
+    ap.add_argument("--fail-step", choices=pipeline.STEP_KEYS, help="simulate a failure at this step")
+    ap.add_argument("--backend", default=DEFAULT_URL or None,
+                    help="backend base URL (default $STORYMORPH_BACKEND_URL; unset = simulated stages)")
+    ap.add_argument("--story-batch", type=int, default=16, metavar="N",
+                    help="max prompts per batched Story Creation call (backend mode; <=1 disables)")
+    ap.add_argument("--story-batch-wait", type=float, default=0.05, metavar="SEC",
+                    help="max time a prompt waits for its Story Creation batch to fill")
+    ap.add_argument("--upload-url", default=UPLOAD_URL or None,
+                    help="upload server for the Upload stage (default $STORYMORPH_UPLOAD_URL, else the backend)")
+    ap.add_argument("--destinations", default=",".join(DESTINATIONS),
+                    help="comma-separated upload destinations (default $STORYMORPH_UPLOAD_DESTINATIONS)")
+    ap.add_argument("--no-eta-history", action="store_true",
+                    help="don't feed observed step durations into the shared ETA model")
+    ap.add_argument("--log-dir", help="also export log lines as rotating, gzip-compressed JSONL in this directory")
+    args = ap.parse_args(argv)
+    # Scaled (simulated) timings would skew the learned durations, so only real-time runs feed the model
+    model = None if args.no_eta_history or args.time_scale != 1.0 else DurationModel.load()
+
+    prompts = read_prompts(args.prompts)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    stop = CancelToken()
+    signal.signal(signal.SIGINT, lambda *_: stop.cancel())   # Ctrl+C = hard cancel of every job in flight
+    backend = BackendClient(args.backend) if args.backend else None
+    destinations = [d.strip() for d in args.destinations.split(",") if d.strip()]
+    uploader = Uploader(args.upload_url or args.backend, destinations) if backend and destinations else None
+    sink = LogSink(args.log_dir, "batch") if args.log_dir else None
+    try:
+        stats, wall = asyncio.run(run_batch(prompts, out, args.concurrency, args.time_scale, args.fail_step, model,
+                                            backend, stop, args.story_batch, args.story_batch_wait, sink, uploader))
+    finally:
+        if out is not sys.stdout: out.close()
+        if sink: sink.close()
+    if model: model.save()
+    # Keep stdout pure JSONL when it carries the events
+    summary = stats.summary(wall)
+    if sink:
+        s = sink.stats(); summary += f"\nlog export: {s['written']} lines to {args.log_dir}, {s['dropped']} dropped"
+    if stop.stop_latency is not None: summary += f"\nstopped by user; quiescent after {stop.stop_latency * 1000:.0f} ms"
+    print(summary, file=sys.stderr if args.output == "-" else sys.stdout)
+    return 0 if stats.jobs_failed == stats.jobs_cancelled == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# batching.py — micro-batching for per-job backend calls (used by Story Creation)
+# - submit(item) parks the caller; a batch is sent when max_batch items are waiting
+#   or the oldest has waited max_wait seconds, whichever comes first
+# - One batched call per flush; each result (or error) is routed back to its caller
+# - Until BASELINE_CALLS single-item round trips have been timed, a flush sends that many of its items on their own,
+#   alongside the rest, so the unbatched per-call time is measured on the same backend (a few extra round trips)
+# - Only the request that succeeded is timed (send_batch reports it): limiter waits and retry backoff are left out
+# - Metrics: batch sizes, queueing wait, round trips saved, items/s over the timed round trips and the gain over
+#   one item per call (items/s x mean single-item round trip)
+
+import asyncio, time
+
+BASELINE_CALLS = 3          # single-item round trips averaged for the unbatched baseline
+
+
+class MicroBatcher:
+    def __init__(self, send_batch, max_batch=16, max_wait=0.05):
+        """send_batch(items, timed) -> list of results (or Exception instances) in the same order;
+        timed(seconds) reports the round trip that succeeded (else the whole call is timed)."""
+        self.send_batch = send_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self._pending = []        # (item, future, enqueued_at)
+        self._timer = None
+        self._inflight = set()
+        # metrics
+        self.batches = self.items = self.max_seen = 0
+        self.wait_s = 0.0         # summed queueing delay of all items
+        self.call_s = 0.0; self.timed_items = 0    # summed round trips of successful calls, items they carried
+        self.single_s = 0.0; self.singles = 0       # successful one-item round trips: the unbatched baseline
+        self._probing = 0                           # one-item calls in flight for the baseline
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((item, fut, time.monotonic()))
+        if len(self._pending) >= self.max_batch: self._flush()
+        elif self._timer is None: self._timer = loop.call_later(self.max_wait, self._flush)
+        return await fut
+
+    def _flush(self):
+        if self._timer is not None: self._timer.cancel(); self._timer = None
+        # callers cancelled while queued are simply left out of the batch
+        live = [p for p in self._pending if not p[1].done()]
+        batch, self._pending = live[:self.max_batch], live[self.max_batch:]
+        if self._pending: self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        if not batch: return
+        probes = min(BASELINE_CALLS - self.singles - self._probing, len(batch) - 1)
+        if probes > 0:
+            self._probing += probes
+            batches = [(batch[k:k + 1], True) for k in range(probes)] + [(batch[probes:], False)]
+        else: batches = [(batch, False)]
+        for b, probe in batches:
+            task = asyncio.ensure_future(self._send(b, probe))
+            self._inflight.add(task); task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch, probe=False):
+        now = time.monotonic()
+        self.batches += 1; self.items += len(batch); self.max_seen = max(self.max_seen, len(batch))
+        self.wait_s += sum(now - t for _, _, t in batch)
+        rtt = []
+        try:
+            results = await self.send_batch([item for item, _, _ in batch], rtt.append)
+            dt = rtt[-1] if rtt else time.monotonic() - now
+            self.call_s += dt; self.timed_items += len(batch)
+            if len(batch) == 1 and not isinstance(results[0], BaseException):
+                self.singles += 1; self.single_s += dt
+        except Exception as e:   # whole call failed -> every caller sees the error
+            results = [e] * len(batch)
+        finally:
+            if probe: self._probing -= 1
+        for (_, fut, _), res in zip(batch, results):
+            if fut.done(): continue
+            if isinstance(res, BaseException): fut.set_exception(res)
+            else: fut.set_result(res)
+
+    def metrics(self):
+        b = self.batches or 1
+        items_per_s = self.timed_items / self.call_s if self.call_s else 0.0
+        single_s = self.single_s / self.singles if self.singles >= BASELINE_CALLS else None
+        return {"batches": self.batches, "items": self.items,
+                "avg_batch": round(self.items / b, 2), "max_batch": self.max_seen,
+                "avg_wait_ms": round(1000 * self.wait_s / (self.items or 1), 1),
+                "round_trips_saved": self.items - self.batches,
+                "items_per_s": round(items_per_s, 2),
+                "unbatched_items_per_s": round(1 / single_s, 2) if single_s else None,
+                "gain": round(items_per_s * single_s, 2) if single_s else None}   # None: baseline not measured yet
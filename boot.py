@@ -0,0 +1,51 @@
+# boot.py — cold-start report for the GUIs (import time, deferred init, time to first frame)
+# - Import this first; T0 is taken at import time, i.e. at the top of the GUI script
+# - phase(name) times a startup step; mark(name) records a moment relative to T0; both keep the
+#   first measurement only (Streamlit re-executes the script, but only the first run is a cold start)
+# - summary() is one line for the Live Logs; report() adds the per-phase breakdown
+#   (printed to stderr when STORYMORPH_STARTUP_REPORT=1)
+
+import os, sys, time
+from contextlib import contextmanager
+
+T0 = time.perf_counter()
+VERBOSE = os.environ.get("STORYMORPH_STARTUP_REPORT", "") not in ("", "0")
+
+phases = {}     # name -> (seconds, deferred); deferred = ran after the first frame or off the UI thread
+marks = {}      # name -> seconds since T0
+
+
+@contextmanager
+def phase(name, deferred=False):
+    t = time.perf_counter()
+    try: yield
+    finally: phases.setdefault(name, (time.perf_counter() - t, deferred))
+
+
+def begin(name, deferred=False):
+    """Like phase() for steps that don't fit a with-block; call the returned function at the end."""
+    t = time.perf_counter()
+    return lambda: phases.setdefault(name, (time.perf_counter() - t, deferred))
+
+
+def mark(name):
+    marks.setdefault(name, time.perf_counter() - T0)
+    return marks[name]
+
+
+def _ms(s): return f"{s * 1000:.0f} ms"
+
+
+def summary():
+    imports = sum(s for n, (s, _) in phases.items() if n.startswith("import"))
+    parts = [f"imports {_ms(imports)}"]
+    parts += [f"{n} {_ms(s)}" for n, s in marks.items()]
+    parts += [f"{n} {_ms(s)} (deferred)" for n, (s, bg) in phases.items() if bg]
+    return "Startup: " + " · ".join(parts)
+
+
+def report(out=None):
+    lines = [summary()] + [f"  {n:<28}{_ms(s):>9}{'  deferred' if bg else ''}" for n, (s, bg) in phases.items()]
+    if out is None and VERBOSE: out = sys.stderr
+    if out is not None: print("\n".join(lines), file=out)
+    return lines
@@ -0,0 +1,63 @@
+# cancellation.py — cross-thread cancel token for pipeline jobs
+# - cancel() may be called from any thread (GUI callbacks, signal handlers)
+# - Bound asyncio tasks are cancelled on their own loop, so in-flight awaits
+#   (HTTP reads, sleeps) abort immediately instead of at the next poll
+# - Measures Stop -> quiescent latency
+
+import asyncio, threading, time
+
+CLEANUP_DEADLINE = 2.0   # seconds allowed for the server-side cancel
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._tasks = {}          # task -> loop
+        self._busy = 0            # jobs still winding down
+        self._idle = threading.Event(); self._idle.set()
+        self.requested_at = None  # monotonic time of cancel()
+        self.quiescent_at = None  # monotonic time the last job finished cleanup
+
+    # threading.Event-compatible surface
+    def is_set(self): return self._event.is_set()
+    def set(self): self.cancel()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set(): return
+            self.requested_at = time.monotonic()
+            self._event.set()
+            tasks = list(self._tasks.items())
+        for task, loop in tasks:
+            try: loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError: pass   # loop already closed
+
+    # ---- in-flight work ----
+    def bind(self, task=None):
+        """Attach an asyncio task (default: current) so cancel() interrupts it; returns an unbind fn."""
+        task = task or asyncio.current_task()
+        with self._lock:
+            self._tasks[task] = asyncio.get_running_loop()
+            self._busy += 1; self._idle.clear()
+            pending = self._event.is_set()
+        if pending: task.cancel()
+
+        def unbind():
+            with self._lock:
+                self._tasks.pop(task, None)
+                self._busy -= 1
+                if self._busy == 0:
+                    self._idle.set()
+                    if self._event.is_set() and self.quiescent_at is None: self.quiescent_at = time.monotonic()
+        return unbind
+
+    # ---- measurement ----
+    def wait_quiescent(self, timeout=None):
+        return self._idle.wait(timeout)
+
+    @property
+    def stop_latency(self):
+        """Seconds from cancel() to every bound job having finished cleanup (None until then)."""
+        if self.requested_at is None or self.quiescent_at is None: return None
+        return max(0.0, self.quiescent_at - self.requested_at)
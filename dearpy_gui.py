@@ -1,11 +1,36 @@
 # workflow_monitor.py — Dear PyGui v2.x
 # Gradient background (viewport), transparent main window (no_background),
 # vertically centered status badge, aligned layout, step card states, v2-safe.
+# Fast startup: the window appears on a plain background; the gradient is generated on a thread,
+# fonts, state themes, the log sink and the thumbnail workers start after the first frame (startup report: boot.py).
+# Artifacts gallery: thumbnails of generated images / videos, made in the background only for the
+# rows scrolled into view (thumbnails.py); textures of rows that scroll out are freed.
+# Upload card: per-destination progress and throughput of the video upload (uploads.py).
+# Benchmark mode (gui_bench.py, STORYMORPH_BENCH): one run of a replayed event stream, every frame timed.
 
-import math, time, threading, os
+import boot   # first: the startup report measures from here
+
+import json, math, time, threading, os, subprocess, sys
+from array import array
 from queue import Queue, Empty
 from datetime import datetime
-import dearpygui.dearpygui as dpg
+with boot.phase("import dearpygui"):
+    import dearpygui.dearpygui as dpg
+
+with boot.phase("import pipeline modules"):
+    import pipeline
+    from event_replay import FrameStats
+    from events import StepStarted, StepProgress, StepFinished, LogRecord, TransferProgress
+    from log_index import LogIndex
+    from log_sink import default_sink
+    from shm_ring import ShmRing
+    from thumbnails import ThumbnailCache, list_artifacts, THUMB_SIZE
+
+STEPS = pipeline.STEPS
+STEP_TAGS = pipeline.STEP_KEYS
+HERE = os.path.dirname(os.path.abspath(__file__))
+RING_CAPACITY = 4096
+BENCH_OUT = os.environ.get("STORYMORPH_BENCH")   # gui_bench.py: start one run, time every frame, write stats here, exit
 
 # ---------------- App state ----------------
 state = {
@@ -14,18 +39,27 @@ state = {
     "start_time": None,
     "overall_progress": 0.0,
     "completed_steps": 0,
-    "total_steps": 3,
-    "fail_step": None,  # set to "video_generation" to simulate failure
+    "total_steps": len(STEPS),
+    "fail_step": None,  # set to e.g. "image_generation" to simulate failure
 }
 
 # Layout
 H_MARGIN = 30
 COL_GAP = 10
 TOP_COL_RATIOS = (0.30, 0.40, 0.30)
+PLAIN_BG = (11,18,32,255)      # viewport color until the gradient is ready
+GRADIENT_SIZE = (256, 160)     # soft gradient: the GPU upscales it without visible loss
+THUMB_W, THUMB_H = THUMB_SIZE
+TILE_H = THUMB_H + 26          # thumbnail + file name
+ROW_H = TILE_H + 10            # + item spacing (APP_DARK)
+GALLERY_H = 170                # one row and a bit: it scrolls
+ARTIFACT_STEPS = ("image_generation", "file_download")
+STEP_CARD_H = 150              # room for the upload destinations in the Upload card
 
 # ---------------- UI queue (v2-safe) ----------------
 _UIQ: Queue = Queue()
 def ui(fn, *a, **k): _UIQ.put((fn, a, k))
+UI_BACKLOG = 128   # queued ui ops (one frame's _drain_ui budget) above which pump_events leaves events in the ring
 def _drain_ui(n=128):
     i=0
     while i<n:
@@ -66,18 +100,69 @@ def gen_soft_gradient_rgba(width=1024, height=640):
     return width, height, data
 
 # ---------------- Logs + helpers ----------------
-def _log_with_theme(msg, theme=None):
-    ts = datetime.now().strftime("%H:%M:%S")
+# Every record goes into an incremental index (log_index.py); the panel shows the records matching
+# the filter row. The index is only touched on the render thread (through ui()).
+LOG_THEMES = {"SUCCESS": "THEME_LOG_SUCCESS", "ERROR": "THEME_LOG_ERROR"}
+LOG_LEVELS = ["INFO", "SUCCESS", "WARNING", "ERROR"]
+LOG_RANGES = {"All time": None, "Last minute": 60, "Last 5 min": 300, "Last 15 min": 900, "Last hour": 3600}
+LOG_PAGE = 300          # records shown after a filter change
+LOG_MAX_ITEMS = 2000    # live-appended lines kept in the panel
+logs = {"index": LogIndex(), "query": {}, "window": None}
+log_sink = None         # structured export (log_sink.py), started after the first frame; None when disabled
+
+def _log_query():
+    q = dict(logs["query"])
+    if logs["window"]: q["since"] = time.time() - logs["window"]
+    return q
+
+def _add_log_item(rid):
+    ts, level, _, msg = logs["index"].record(rid)
+    item = dpg.add_text(f"{datetime.fromtimestamp(ts).strftime('%H:%M:%S')}  {level:<7} | {msg}", parent="log_scroller")
+    theme = LOG_THEMES.get(level)
+    if theme: dpg.bind_item_theme(item, theme)
+    return item
+
+def _scroll_logs_to_end():
+    try: dpg.set_y_scroll("log_region", dpg.get_y_scroll_max("log_region"))
+    except Exception: pass
+
+def _log_with_theme(level, msg, when=None, step=None):
+    when = when or time.time()
+    if log_sink: log_sink.emit(when, level, msg, step)   # in-memory enqueue; written by the sink's thread
     def _do():
-        item = dpg.add_text(f"{ts}  {msg}", parent="log_scroller")
-        if theme: dpg.bind_item_theme(item, theme)
-        try: dpg.set_y_scroll("log_region", dpg.get_y_scroll_max("log_region"))
-        except Exception: pass
+        rid = logs["index"].add(when, level, step, msg)
+        q = _log_query()
+        if q and not logs["index"].matches(rid, **q): return
+        _add_log_item(rid)
+        kids = dpg.get_item_children("log_scroller", 1)
+        if len(kids) > LOG_MAX_ITEMS: dpg.delete_item(kids[0])
+        _scroll_logs_to_end()
     ui(_do)
 
-def log_info(msg):    _log_with_theme(msg, None)
-def log_success(msg): _log_with_theme(msg, "THEME_LOG_SUCCESS")
-def log_error(msg):   _log_with_theme(msg, "THEME_LOG_ERROR")
+def log_info(msg):    _log_with_theme("INFO", msg)
+def log_success(msg): _log_with_theme("SUCCESS", msg)
+def log_error(msg):   _log_with_theme("ERROR", msg)
+
+def show_logs():
+    # Rebuild the panel from the index: newest page of matches, oldest at the top
+    def _do():
+        hits = logs["index"].search(**_log_query(), limit=LOG_PAGE)
+        dpg.delete_item("log_scroller", children_only=True)
+        for rid in reversed(hits): _add_log_item(rid)
+        more = "+" if len(hits) == LOG_PAGE else ""
+        dpg.set_value("log_count", f"{len(hits)}{more} of {len(logs['index'])} records")
+        _scroll_logs_to_end()
+    ui(_do)
+
+def log_filter_changed(*_):
+    level, step = dpg.get_value("log_f_level"), dpg.get_value("log_f_step")
+    titles = {s["title"]: s["key"] for s in STEPS}
+    q = {}
+    if level in LOG_LEVELS: q["levels"] = [level]
+    if step in titles: q["steps"] = [titles[step]]
+    if dpg.get_value("log_f_text").strip(): q["text"] = dpg.get_value("log_f_text")
+    logs["query"], logs["window"] = q, LOG_RANGES.get(dpg.get_value("log_f_range"))
+    show_logs()
 
 def set_status(x): ui(dpg.set_value, "status_label", x)  # hidden text (we use the badge)
 def set_badge(text, running):
@@ -110,63 +195,183 @@ def set_timing():
         delta = datetime.now() - state["start_time"]
         dpg.set_value("duration_val", "less than a minute" if delta.total_seconds()<60 else f"{int(delta.total_seconds()//60)} min")
     ui(_do)
+def set_stop_latency(sec):
+    ui(dpg.set_value, "stop_latency", "" if sec is None else f"Stopped in {sec*1000:.0f} ms")
 def clear_logs():
     def _do():
+        logs["index"] = LogIndex()
         dpg.delete_item("log_scroller", children_only=True)
-        dpg.add_text("", parent="log_scroller")
+        dpg.set_value("log_count", "")
     ui(_do)
-def mark_step_failed(tag, title, reason="Step failed"):
-    set_card_state(tag,"error"); log_error(f"ERROR | {title}: {reason}")
+transfers = {}    # upload destination -> (sent, total, B/s, done)
+def set_transfers():
+    text = "\n".join(f"{dest}  {sent * 100 // max(1, total)}%  {rate / 1e6:.1f} MB/s{'  done' if done else ''}"
+                     for dest, (sent, total, rate, done) in transfers.items())
+    ui(dpg.set_value, "upload_transfers", text)
+def clear_transfers(): transfers.clear(); set_transfers()
+def mark_step_failed(tag):
+    set_card_state(tag,"error")
     state["running"]=False; set_status("Error"); set_badge("Error", False); set_controls(False)
 
+# ---------------- Artifacts gallery ----------------
+# Only the rows in (or next to) the visible part of the gallery exist as widgets; spacers stand in for
+# the rest. Their thumbnails are requested from the worker pool and become textures as they arrive.
+thumbs = None           # ThumbnailCache, started after the first frame (its workers aren't needed before)
+gallery = {"items": [], "cols": 0, "rows": None, "tiles": {}, "tex": {}}   # tex: path -> (texture, w, h)
+_BYTE_TO_FLOAT = [i / 255 for i in range(256)]
+THUMBS_PER_FRAME = 4    # textures created per frame when many thumbnails arrive at once
+
+def refresh_artifacts():
+    def _work():
+        items = list_artifacts()
+        def _do():
+            thumbs.forget()      # files may have been replaced: drop every thumbnail and texture
+            dpg.delete_item("gallery_rows", children_only=True); gallery["tiles"].clear()
+            for tex, _, _ in gallery["tex"].values(): dpg.delete_item(tex)
+            gallery["tex"].clear()
+            gallery.update(items=items, rows=None)
+            dpg.set_value("gallery_count", f"{len(items)} artifacts" if items else "none yet")
+        ui(_do)
+    threading.Thread(target=_work, daemon=True).start()
+
+def _build_gallery_rows(first, last):
+    cols, items = gallery["cols"], gallery["items"]
+    total = -(-len(items) // cols)
+    dpg.delete_item("gallery_rows", children_only=True)
+    gallery["tiles"].clear()
+    if first: dpg.add_spacer(height=first * ROW_H - 10, parent="gallery_rows")
+    for r in range(first, last + 1):
+        with dpg.group(horizontal=True, parent="gallery_rows"):
+            for path, kind in items[r * cols:(r + 1) * cols]:
+                with dpg.child_window(width=THUMB_W, height=TILE_H, border=False, no_scrollbar=True):
+                    tex, w, h = gallery["tex"].get(path, ("thumb_placeholder", THUMB_W, THUMB_H))
+                    gallery["tiles"][path] = dpg.add_image(tex, width=w, height=h)
+                    dpg.add_text(("▶ " if kind == "video" else "") + os.path.basename(path))
+    if total - last - 1 > 0: dpg.add_spacer(height=(total - last - 1) * ROW_H - 10, parent="gallery_rows")
+    for path in [p for p in gallery["tex"] if p not in gallery["tiles"]]:   # scrolled out: free the texture
+        dpg.delete_item(gallery["tex"].pop(path)[0])
+
+def update_gallery():
+    items = gallery["items"]
+    if not items:
+        if gallery["rows"] is None:
+            gallery.update(cols=1, rows=(0, -1)); _build_gallery_rows(0, -1)
+        return
+    gw, gh = dpg.get_item_rect_size("gallery")
+    cols = max(1, int(((gw or 800) - 24) // (THUMB_W + COL_GAP)))
+    y = dpg.get_y_scroll("gallery")
+    first, last = int(y // ROW_H), int((y + (gh or GALLERY_H)) // ROW_H)
+    total = -(-len(items) // cols)
+    rows = (max(0, first - 1), min(total - 1, last + 1))
+    if cols != gallery["cols"] or rows != gallery["rows"]:
+        gallery.update(cols=cols, rows=rows); _build_gallery_rows(*rows)
+    # visible rows first, then the rows kept around them
+    order = (items[first * cols:(last + 1) * cols] + items[rows[0] * cols:first * cols]
+             + items[(last + 1) * cols:(rows[1] + 1) * cols])
+    thumbs.want([p for p, _ in order])
+    made = 0
+    for path, img in gallery["tiles"].items():
+        if made >= THUMBS_PER_FRAME: break
+        if path in gallery["tex"]: continue
+        px = thumbs.pixels(path)
+        if px is None: continue
+        w, h, rgba = px
+        tex = dpg.add_static_texture(w, h, array("f", map(_BYTE_TO_FLOAT.__getitem__, rgba)), parent="textures")
+        gallery["tex"][path] = (tex, w, h)
+        dpg.configure_item(img, texture_tag=tex, width=w, height=h)
+        made += 1
+
 # ---------------- Worker ----------------
-def run_pipeline():
-    steps = [
-        ("story_creation",   "Story Creation",   "Generating story using ChatGPT API…"),
-        ("video_generation", "Video Generation", "Automating 3rd-party web app with Playwright…"),
-        ("file_download",    "File Download",    "Downloading completed video file…"),
-    ]
-    total_ticks=120; per_step=total_ticks//len(steps)
-    for i,(tag,title,desc) in enumerate(steps, start=1):
-        if state["stop_flag"]: log_info("INFO  | Pipeline stopped by user."); return
-        log_info(f"INFO  | Step {i}/{len(steps)}: {desc}")
-        set_dot(tag, False); set_card_state(tag,"idle")
-        for _ in range(per_step):
-            if state["stop_flag"]: log_info("INFO  | Pipeline stopping…"); return
-            if state.get("fail_step")==tag: mark_step_failed(tag,title,"Simulated failure"); return
-            time.sleep(0.03)
-            state["overall_progress"]=min(1.0, state["overall_progress"]+1/total_ticks)
-            set_progress(); set_timing()
-        state["completed_steps"]+=1; set_steps(); set_dot(tag, True)
-        set_card_state(tag,"done"); log_success(f"SUCCESS | {title} completed.")
-    log_success("SUCCESS | Workflow completed.")
-    state["running"]=False; set_status("Idle"); set_badge("Idle",False); set_controls(False)
+# The pipeline runs in a separate process (process_worker.py) so CPU-heavy steps never compete
+# with the render loop for the GIL. Events arrive through a shared-memory ring that the render
+# loop polls once per frame; Stop is a "stop" line on the worker's stdin.
+worker = {"proc": None, "ring": None}
+
+def apply_event(ev):
+    if isinstance(ev, LogRecord):
+        _log_with_theme(ev.level, ev.msg, ev.ts, ev.step)
+    elif isinstance(ev, TransferProgress):
+        transfers[ev.dest] = (ev.sent, ev.total, ev.rate, ev.done); set_transfers()
+    elif isinstance(ev, StepStarted):
+        set_dot(ev.step, False); set_card_state(ev.step,"idle")
+    elif isinstance(ev, StepProgress):
+        state["overall_progress"]=min(1.0, (ev.index+ev.value)/len(STEPS))
+        set_progress(); set_timing()
+    elif isinstance(ev, StepFinished):
+        if ev.ok:
+            state["completed_steps"]+=1; set_steps(); set_dot(ev.step, True); set_card_state(ev.step,"done")
+            if ev.step in ARTIFACT_STEPS: refresh_artifacts()
+        elif ev.status == StepFinished.FAILED:
+            mark_step_failed(ev.step)
+
+def pump_events(n=256):
+    # Called once per frame; bounded so a log burst can't stretch a frame, and paced by _UIQ so events aren't
+    # turned into ui ops faster than _drain_ui applies them (the ring holds the backlog instead)
+    ring = worker["ring"]
+    if ring is None: return
+    while n > 0 and _UIQ.qsize() < UI_BACKLOG:
+        evs = ring.read(min(n, 32))
+        if not evs: break
+        for ev in evs: apply_event(ev)
+        n -= len(evs)
+    p = worker["proc"]
+    if state["running"] and (p is None or p.poll() is not None) and not len(ring):
+        state["running"]=False; set_status("Idle"); set_badge("Idle",False); set_controls(False)
+
+def _send_stop(p):
+    try: p.stdin.write(b"stop\n"); p.stdin.flush()
+    except (OSError, ValueError): pass
+
+def _close_worker(defer=True):
+    p, ring = worker["proc"], worker["ring"]
+    worker.update(proc=None, ring=None)
+    if p is not None and p.poll() is None:
+        _send_stop(p)
+        try: p.wait(3)
+        except subprocess.TimeoutExpired: p.kill()
+    # callbacks run off the render thread: unmap the ring on the render thread, after its last read
+    if ring is not None: ui(ring.close) if defer else ring.close()
 
 # ---------------- Callbacks ----------------
 def start_clicked():
     if state["running"]: return
+    _close_worker()
     state.update(running=True, stop_flag=False, start_time=datetime.now(), overall_progress=0.0, completed_steps=0)
     set_status("Running"); set_badge("Running", True)
-    for t in ("story_creation","video_generation","file_download"): set_dot(t, False); set_card_state(t,"idle")
+    for t in STEP_TAGS: set_dot(t, False); set_card_state(t,"idle")
+    clear_transfers()
     set_steps(); set_progress(); set_timing(); set_controls(True)
-    log_info("INFO  | Initializing ChatGPT API connection")
-    log_info("INFO  | Sending story generation prompt")
-    threading.Thread(target=run_pipeline, daemon=True).start()
+    set_stop_latency(None)
+    ring = ShmRing.create(RING_CAPACITY)
+    cmd = [sys.executable, os.path.join(HERE, "process_worker.py"), "--shm", ring.name, "--capacity", str(RING_CAPACITY)]
+    if state.get("fail_step"): cmd += ["--fail-step", state["fail_step"]]
+    worker["ring"] = ring
+    worker["proc"] = subprocess.Popen(cmd, cwd=HERE, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL)
 
 def stop_clicked():
     if not state["running"]: return
     state["stop_flag"]=True; state["running"]=False
-    set_status("Idle"); set_badge("Idle", False); set_controls(False); log_info("INFO  | Stop clicked")
+    p = worker["proc"]
+    if p is not None:
+        # Hard cancel in the worker; latency = Stop click -> worker process fully exited
+        t0 = time.monotonic(); _send_stop(p)
+        def _measure():
+            try: p.wait(10); set_stop_latency(time.monotonic() - t0)
+            except subprocess.TimeoutExpired: p.kill()
+        threading.Thread(target=_measure, daemon=True).start()
+    set_status("Idle"); set_badge("Idle", False); set_controls(False); log_info("Stop clicked")
 
 def reset_clicked():
+    _close_worker()
     state.update(running=False, stop_flag=False, start_time=None, overall_progress=0.0, completed_steps=0, fail_step=None)
     set_status("Idle"); set_badge("Idle", False); set_controls(False)
-    clear_logs(); set_steps(); set_progress(); set_timing()
-    for t in ("story_creation","video_generation","file_download"): set_dot(t, False); set_card_state(t,"idle")
-    log_info("INFO  | Reset complete")
+    clear_logs(); clear_transfers(); set_steps(); set_progress(); set_timing(); set_stop_latency(None)
+    for t in STEP_TAGS: set_dot(t, False); set_card_state(t,"idle")
+    log_info("Reset complete")
 
 # ---------------- UI / Themes ----------------
 dpg.create_context()
+_end_ui_phase = boot.begin("build themes + widgets")
 
 with dpg.theme(tag="APP_DARK"):
     with dpg.theme_component(dpg.mvAll):
@@ -200,18 +405,14 @@ def make_btn_theme(name, color, hov=None, act=None, text=(235,235,235,255), disa
             dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 14)
             dpg.add_theme_style(dpg.mvStyleVar_FramePadding,  16, pad_y)
 
+# Idle-state themes (bound before the first frame)
 make_btn_theme("THEME_START_ENABLED",  (24,151,78,255), (27,173,88,255), (20,133,69,255))
-make_btn_theme("THEME_START_DISABLED", (70,78,92,255),  disabled=True)
-make_btn_theme("THEME_STOP_ENABLED",   (180,56,56,255), (205,64,64,255), (150,45,45,255))
 make_btn_theme("THEME_STOP_DISABLED",  (70,78,92,255),  disabled=True)
 make_btn_theme("THEME_RESET",          (62,72,86,255),  (72,86,104,255), (50,60,72,255))
 
 # Badge themes: centered look -> pad_y=6 + height=30 on the button
-make_btn_theme("THEME_BADGE_RUNNING_BTN", (24,151,78,255), text=(255,255,255,255), pad_y=6)
 make_btn_theme("THEME_BADGE_IDLE_BTN",    (70,78,92,255),  text=(235,235,235,255), pad_y=6)
 
-with dpg.theme(tag="THEME_DOT_DONE"):
-    with dpg.theme_component(dpg.mvText): dpg.add_theme_color(dpg.mvThemeCol_Text, (24,151,78,255))
 with dpg.theme(tag="THEME_DOT_IDLE"):
     with dpg.theme_component(dpg.mvText): dpg.add_theme_color(dpg.mvThemeCol_Text, (130,138,150,255))
 
@@ -221,21 +422,28 @@ with dpg.theme(tag="THEME_CARD_IDLE"):
         dpg.add_theme_color(dpg.mvThemeCol_ChildBg, (30,38,50,128))
         dpg.add_theme_color(dpg.mvThemeCol_Border,  (55,66,82,200))
         dpg.add_theme_style(dpg.mvStyleVar_ChildBorderSize,1)
-with dpg.theme(tag="THEME_CARD_DONE"):
-    with dpg.theme_component(dpg.mvChildWindow):
-        dpg.add_theme_color(dpg.mvThemeCol_ChildBg, (24,151,78,128))
-        dpg.add_theme_color(dpg.mvThemeCol_Border,  (24,151,78,255))
-        dpg.add_theme_style(dpg.mvStyleVar_ChildBorderSize,2)
-with dpg.theme(tag="THEME_CARD_ERROR"):
-    with dpg.theme_component(dpg.mvChildWindow):
-        dpg.add_theme_color(dpg.mvThemeCol_ChildBg, (200,60,60,128))
-        dpg.add_theme_color(dpg.mvThemeCol_Border,  (200,60,60,255))
-        dpg.add_theme_style(dpg.mvStyleVar_ChildBorderSize,2)
 
-with dpg.theme(tag="THEME_LOG_SUCCESS"):
-    with dpg.theme_component(dpg.mvText): dpg.add_theme_color(dpg.mvThemeCol_Text, (24,151,78,255))
-with dpg.theme(tag="THEME_LOG_ERROR"):
-    with dpg.theme_component(dpg.mvText): dpg.add_theme_color(dpg.mvThemeCol_Text, (220,70,70,255))
+# Run-state themes: first needed after Start / on a log line, so built after the first frame
+def build_state_themes():
+    make_btn_theme("THEME_START_DISABLED", (70,78,92,255),  disabled=True)
+    make_btn_theme("THEME_STOP_ENABLED",   (180,56,56,255), (205,64,64,255), (150,45,45,255))
+    make_btn_theme("THEME_BADGE_RUNNING_BTN", (24,151,78,255), text=(255,255,255,255), pad_y=6)
+    with dpg.theme(tag="THEME_DOT_DONE"):
+        with dpg.theme_component(dpg.mvText): dpg.add_theme_color(dpg.mvThemeCol_Text, (24,151,78,255))
+    with dpg.theme(tag="THEME_CARD_DONE"):
+        with dpg.theme_component(dpg.mvChildWindow):
+            dpg.add_theme_color(dpg.mvThemeCol_ChildBg, (24,151,78,128))
+            dpg.add_theme_color(dpg.mvThemeCol_Border,  (24,151,78,255))
+            dpg.add_theme_style(dpg.mvStyleVar_ChildBorderSize,2)
+    with dpg.theme(tag="THEME_CARD_ERROR"):
+        with dpg.theme_component(dpg.mvChildWindow):
+            dpg.add_theme_color(dpg.mvThemeCol_ChildBg, (200,60,60,128))
+            dpg.add_theme_color(dpg.mvThemeCol_Border,  (200,60,60,255))
+            dpg.add_theme_style(dpg.mvStyleVar_ChildBorderSize,2)
+    with dpg.theme(tag="THEME_LOG_SUCCESS"):
+        with dpg.theme_component(dpg.mvText): dpg.add_theme_color(dpg.mvThemeCol_Text, (24,151,78,255))
+    with dpg.theme(tag="THEME_LOG_ERROR"):
+        with dpg.theme_component(dpg.mvText): dpg.add_theme_color(dpg.mvThemeCol_Text, (220,70,70,255))
 
 with dpg.theme(tag="THEME_PROGRESS"):
     with dpg.theme_component(dpg.mvProgressBar):
@@ -244,30 +452,39 @@ with dpg.theme(tag="THEME_PROGRESS"):
             dpg.add_theme_color(dpg.mvThemeCol_PlotHistogramHovered, (27,173,88,255))
         dpg.add_theme_color(dpg.mvThemeCol_FrameBg, (38,46,60,200))
 
-# Fonts (optional pleasant defaults)
+# Fonts (optional pleasant defaults) — loaded after the first frame
 def _first_font(paths, size):
     for p in paths:
         if p and os.path.exists(p):
             try: return dpg.add_font(p, size)
             except Exception: pass
     return None
-with dpg.font_registry():
-    BODY = _first_font([r"C:\Windows\Fonts\Inter.ttf",
-                        r"C:\Windows\Fonts\Inter-Regular.ttf",
-                        r"C:\Windows\Fonts\segoeui.ttf"], 16)
-if BODY: dpg.bind_font(BODY)
+def load_fonts():
+    with dpg.font_registry():
+        body = _first_font([r"C:\Windows\Fonts\Inter.ttf",
+                            r"C:\Windows\Fonts\Inter-Regular.ttf",
+                            r"C:\Windows\Fonts\segoeui.ttf"], 16)
+    if body: dpg.bind_font(body)
 
 # ---------------- Build UI ----------------
 dpg.create_viewport(title="Workflow Monitor", width=1240, height=820)
+dpg.set_viewport_clear_color(PLAIN_BG)
 
-# Create gradient texture
-with dpg.texture_registry():
-    gw, gh, gdata = gen_soft_gradient_rgba(1024, 640)
-    dpg.add_static_texture(gw, gh, gdata, tag="bg_texture")
-
-# Draw gradient BEHIND everything on the viewport drawlist
+# Gradient BEHIND everything on the viewport drawlist; generated on a thread, drawn once ready
+dpg.add_texture_registry(tag="textures")
+dpg.add_static_texture(1, 1, [0.16, 0.20, 0.27, 1.0], tag="thumb_placeholder", parent="textures")
 bg_draw = dpg.add_viewport_drawlist(front=False, tag="bg_draw")
-bg_img  = dpg.draw_image("bg_texture", (0,0), (1240,820), parent=bg_draw)
+bg = {"img": None, "ready": threading.Event()}
+
+def _load_gradient():
+    with boot.phase("gradient texture", deferred=True):
+        gw, gh, gdata = gen_soft_gradient_rgba(*GRADIENT_SIZE)
+    def _do():
+        dpg.add_static_texture(gw, gh, gdata, tag="bg_texture", parent="textures")
+        vw, vh = dpg.get_viewport_client_width() or 1240, dpg.get_viewport_client_height() or 820
+        bg["img"] = dpg.draw_image("bg_texture", (0,0), (vw, vh), parent=bg_draw)
+        bg["ready"].set()
+    ui(_do)
 
 with dpg.window(
     label="Workflow Monitor",
@@ -288,6 +505,7 @@ with dpg.window(
                 dpg.add_text("Current:"); dpg.add_spacer(width=6)
                 dpg.add_text("", tag="status_label", show=False)   # hide duplicate text
                 dpg.add_button(label="Idle", width=96, height=30, tag="status_badge_btn")  # centered badge
+            dpg.add_text("", tag="stop_latency")
         with dpg.child_window(height=130, border=True, no_scrollbar=True, tag="card_timing"):
             dpg.add_text("Timing"); dpg.add_spacer(height=6)
             with dpg.group(horizontal=True):
@@ -299,7 +517,7 @@ with dpg.window(
         with dpg.child_window(height=130, border=True, no_scrollbar=True, tag="card_progsummary"):
             dpg.add_text("Progress"); dpg.add_spacer(height=6)
             with dpg.group(horizontal=True):
-                dpg.add_text("0/3", tag="steps_counter"); dpg.add_spacer(width=6)
+                dpg.add_text(f"0/{len(STEPS)}", tag="steps_counter"); dpg.add_spacer(width=6)
                 dpg.add_text("Steps Completed")
 
     dpg.add_spacer(height=12)
@@ -315,55 +533,76 @@ with dpg.window(
     with dpg.group(tag="progress_container"):
         dpg.add_progress_bar(default_value=0.0, width=10, overlay="0%", tag="overall_progress_bar")
         dpg.bind_item_theme("overall_progress_bar", "THEME_PROGRESS")
+        dpg.add_text("", tag="rate_limits")
 
     dpg.add_spacer(height=6)
     dpg.add_text("WORKFLOW STEPS")
     with dpg.group(horizontal=True, tag="steps_row"):
-        for tag, title, sub in [
-            ("story_creation", "Story Creation", "Generating story using ChatGPT API"),
-            ("video_generation","Video Generation","Automating 3rd party web app with Playwright"),
-            ("file_download",   "File Download",   "Downloading completed video file"),
-        ]:
-            with dpg.child_window(height=110, border=True, no_scrollbar=True, tag=f"{tag}_card"):
+        for step in STEPS:
+            tag, title, sub = step["key"], step["title"], step["desc"]
+            with dpg.child_window(height=STEP_CARD_H, border=True, no_scrollbar=True, tag=f"{tag}_card"):
                 with dpg.group(horizontal=True):
                     dpg.add_text("●", tag=f"{tag}_dot")
                     dpg.add_text(title)
                 dpg.add_spacer(height=4)
-                dpg.add_text(sub)
+                dpg.add_text(sub, wrap=0, tag=f"{tag}_desc")
+                if tag == "upload": dpg.add_text("", tag="upload_transfers")
+
+    dpg.add_spacer(height=12)
+    with dpg.group(horizontal=True):
+        dpg.add_text("Artifacts"); dpg.add_spacer(width=16)
+        dpg.add_button(label="Refresh", callback=lambda: refresh_artifacts())
+        dpg.add_text("", tag="gallery_count")
+    with dpg.child_window(height=GALLERY_H, border=True, tag="gallery"):
+        dpg.add_group(tag="gallery_rows")
 
     dpg.add_spacer(height=12)
-    dpg.add_text("Live Logs")
+    with dpg.group(horizontal=True):
+        dpg.add_text("Live Logs"); dpg.add_spacer(width=16)
+        dpg.add_combo(["All levels"] + LOG_LEVELS, default_value="All levels", width=120,
+                      tag="log_f_level", callback=log_filter_changed)
+        dpg.add_combo(["All steps"] + [s["title"] for s in STEPS], default_value="All steps", width=190,
+                      tag="log_f_step", callback=log_filter_changed)
+        dpg.add_input_text(hint="Search logs...", width=240, tag="log_f_text", callback=log_filter_changed)
+        dpg.add_combo(list(LOG_RANGES), default_value="All time", width=120,
+                      tag="log_f_range", callback=log_filter_changed)
+        dpg.add_text("", tag="log_count")
+        dpg.add_text("", tag="log_sink_stats")
     with dpg.child_window(height=260, border=True, tag="log_region"):  # keep scrollbar here
-        with dpg.group(tag="log_scroller"):
-            dpg.add_text("")
+        dpg.add_group(tag="log_scroller")
 
 # Bind themes
 dpg.bind_theme("APP_DARK")
 dpg.bind_item_theme("main", "THEME_MAIN_TRANSPARENT_BG")
 for t in ("card_status","card_timing","card_progsummary"): dpg.bind_item_theme(t,"THEME_CARD_IDLE")
 set_controls(False); set_badge("Idle", False)
-for t in ("story_creation","video_generation","file_download"):
+for t in STEP_TAGS:
     set_dot(t, False); set_card_state(t, "idle")
 set_steps(); set_progress(); set_timing()
 dpg.bind_item_theme("status_badge_btn", "THEME_BADGE_IDLE_BTN")
+_end_ui_phase()
 
-# Fonts (optional)
-if 'BODY' in locals() and BODY: dpg.bind_font(BODY)
-
+threading.Thread(target=_load_gradient, daemon=True).start()
 dpg.setup_dearpygui()
+if BENCH_OUT: dpg.set_viewport_vsync(False)     # measure the work per frame, not the display's refresh rate
 dpg.show_viewport()
 dpg.set_primary_window("main", True)
 
 # ---------------- Manual render loop ----------------
 prev_vw = prev_vh = 0
 prev_main_w = 0
+next_rl_refresh = next_sink_refresh = next_gallery = 0.0
+frame = 0; startup_reported = False
+frames = FrameStats()
 while dpg.is_dearpygui_running():
+    t_frame = time.perf_counter()
+    pump_events()
     _drain_ui()
 
     # Resize gradient to viewport
     vw, vh = dpg.get_viewport_client_width(), dpg.get_viewport_client_height()
-    if (vw and vh) and (vw!=prev_vw or vh!=prev_vh):
-        dpg.configure_item(bg_img, pmin=(0,0), pmax=(vw, vh))
+    if bg["img"] is not None and (vw and vh) and (vw!=prev_vw or vh!=prev_vh):
+        dpg.configure_item(bg["img"], pmin=(0,0), pmax=(vw, vh))
         prev_vw, prev_vh = vw, vh
 
     # Align widths to progress bar right edge
@@ -376,12 +615,53 @@ while dpg.is_dearpygui_running():
         dpg.set_item_width("card_status", w1)
         dpg.set_item_width("card_timing", w2)
         dpg.set_item_width("card_progsummary", w3)
-        w_step = int((target_w - 2*COL_GAP)/3)
-        dpg.set_item_width("story_creation_card",  w_step)
-        dpg.set_item_width("video_generation_card",w_step)
-        dpg.set_item_width("file_download_card",   w_step)
+        w_step = int((target_w - (len(STEPS)-1)*COL_GAP)/len(STEPS))
+        for t in STEP_TAGS:
+            dpg.set_item_width(f"{t}_card", w_step)
+            dpg.configure_item(f"{t}_desc", wrap=w_step-24)
         prev_main_w = mw
 
+    # Rate limiter state (published by the worker process in the ring's stats block), once per second
+    if time.monotonic() >= next_rl_refresh and worker["ring"] is not None:
+        stats = worker["ring"].read_stats() or {}
+        dpg.set_value("rate_limits", "   ".join(
+            f"{b['name']}: {b['rate']:g}/{b['max_rate']:g} req/s, {max(0.0, b['tokens']):.1f} tok, "
+            f"queue {b['queue_depth']}, throttled {b['throttled_s']:.1f}s, 429x{b['throttles']}"
+            for b in stats.get("rate_limits", [])))
+        next_rl_refresh = time.monotonic() + 1.0
+    if log_sink and time.monotonic() >= next_sink_refresh:
+        s = log_sink.stats()
+        dpg.set_value("log_sink_stats", f"  {s['dropped']} not exported (disk too slow)" if s["dropped"] else "")
+        next_sink_refresh = time.monotonic() + 1.0
+
+    if time.monotonic() >= next_gallery:
+        update_gallery(); next_gallery = time.monotonic() + 0.05
+
     dpg.render_dearpygui_frame()
 
+    # Startup: everything not needed for the first frame
+    frame += 1
+    if frame == 1:
+        boot.mark("first frame")
+        with boot.phase("fonts + state themes", deferred=True):
+            build_state_themes(); load_fonts()
+        with boot.phase("log sink + thumbnail workers", deferred=True):
+            log_sink = default_sink("dearpygui"); thumbs = ThumbnailCache(keep_pixels=True)
+        refresh_artifacts()
+    elif not startup_reported and bg["ready"].is_set():
+        startup_reported = True
+        log_info(boot.summary()); boot.report()
+
+    if BENCH_OUT:
+        frames.add(time.perf_counter() - t_frame)
+        if frame == 3:
+            frames = FrameStats(); start_clicked()      # startup frames don't count
+        elif frame > 3 and not state["running"] and _UIQ.empty():     # every queued op applied and timed
+            with open(BENCH_OUT, "w") as f:
+                json.dump({"frames": frames.summary(), "log_records": len(logs["index"])}, f)
+            break
+
+_close_worker(defer=False)
+if thumbs: thumbs.close()
+if log_sink: log_sink.close()
 dpg.destroy_context()
@@ -0,0 +1,145 @@
+# eta.py — per-stage duration model for time-weighted progress and ETA
+# - EWMA mean + streaming P² quantiles (p10 / p50 / p90) per stage, O(1) per observation
+# - Optional conditioning on input size (log2 buckets, falls back to the stage-wide stats)
+# - Persisted as JSON between runs (STORYMORPH_ETA_PATH or ~/.storymorph/durations.json)
+
+import json, math, os, tempfile
+
+import pipeline
+
+DEFAULT_PATH = os.environ.get("STORYMORPH_ETA_PATH",
+                              os.path.join(os.path.expanduser("~"), ".storymorph", "durations.json"))
+QUANTILES = (0.10, 0.50, 0.90)
+MIN_BUCKET_SAMPLES = 3
+
+
+# ---------------- Streaming quantile (Jain & Chlamtac P²) ----------------
+class P2Quantile:
+    __slots__ = ("p", "q", "n", "np", "dn")
+
+    def __init__(self, p):
+        self.p = p
+        self.q = []                     # marker heights (first 5 samples kept raw)
+        self.n = [0, 1, 2, 3, 4]        # marker positions
+        self.np = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self.dn = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        q = self.q
+        if len(q) < 5:
+            q.append(x); q.sort(); return
+        if x < q[0]: q[0] = x; k = 0
+        elif x >= q[4]: q[4] = x; k = 3
+        else: k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+        for i in range(k + 1, 5): self.n[i] += 1
+        for i in range(5): self.np[i] += self.dn[i]
+        for i in (1, 2, 3):
+            d = self.np[i] - self.n[i]
+            if (d >= 1 and self.n[i + 1] - self.n[i] > 1) or (d <= -1 and self.n[i - 1] - self.n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = self._parabolic(i, d)
+                if not q[i - 1] < qp < q[i + 1]: qp = q[i] + d * (q[i + d] - q[i]) / (self.n[i + d] - self.n[i])
+                q[i] = qp; self.n[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self.q, self.n
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    def value(self):
+        q = self.q
+        if not q: return None
+        if len(q) < 5: return q[min(len(q) - 1, int(round(self.p * (len(q) - 1))))]
+        return q[2]
+
+    def to_dict(self): return {"p": self.p, "q": self.q, "n": self.n, "np": self.np}
+
+    @classmethod
+    def from_dict(cls, d):
+        o = cls(d["p"]); o.q = list(d["q"]); o.n = list(d["n"]); o.np = list(d["np"]); return o
+
+
+class StageStats:
+    __slots__ = ("count", "ewma", "quantiles")
+
+    def __init__(self):
+        self.count = 0; self.ewma = None
+        self.quantiles = [P2Quantile(p) for p in QUANTILES]
+
+    def add(self, seconds, alpha):
+        self.count += 1
+        self.ewma = seconds if self.ewma is None else alpha * seconds + (1 - alpha) * self.ewma
+        for q in self.quantiles: q.add(seconds)
+
+    def estimate(self):
+        lo, _, hi = (q.value() for q in self.quantiles)
+        return self.ewma, min(lo, self.ewma), max(hi, self.ewma)
+
+    def to_dict(self): return {"count": self.count, "ewma": self.ewma, "q": [q.to_dict() for q in self.quantiles]}
+
+    @classmethod
+    def from_dict(cls, d):
+        o = cls(); o.count = d["count"]; o.ewma = d["ewma"]
+        o.quantiles = [P2Quantile.from_dict(q) for q in d["q"]]; return o
+
+
+def size_bucket(size):
+    return None if not size else str(int(math.log2(max(1, size))))
+
+
+# ---------------- Model ----------------
+class DurationModel:
+    def __init__(self, path=DEFAULT_PATH, alpha=0.3):
+        self.path = path; self.alpha = alpha
+        self.stats = {}      # (stage, bucket|None) -> StageStats
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH, **kw):
+        m = cls(path, **kw)
+        try:
+            with open(path, encoding="utf-8") as f: raw = json.load(f)
+            for key, d in raw.items():
+                stage, _, bucket = key.partition("|")
+                m.stats[(stage, bucket or None)] = StageStats.from_dict(d)
+        except (OSError, ValueError, KeyError):
+            pass
+        return m
+
+    def save(self):
+        if not self.path: return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        raw = {f"{s}|{b or ''}": st.to_dict() for (s, b), st in self.stats.items()}
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f: json.dump(raw, f)
+        os.replace(tmp, self.path)
+
+    def observe(self, stage, seconds, size=None):
+        for key in {(stage, None), (stage, size_bucket(size))}:
+            self.stats.setdefault(key, StageStats()).add(seconds, self.alpha)
+
+    def expected(self, stage, size=None):
+        """(mean, low, high) seconds for one stage; falls back to the static STEPS duration."""
+        st = self.stats.get((stage, size_bucket(size)))
+        if st is None or st.count < MIN_BUCKET_SAMPLES: st = self.stats.get((stage, None)) or st
+        if st is None or not st.count:
+            d = pipeline.STEPS[pipeline.STEP_KEYS.index(stage)]["duration"]
+            return d, d, d
+        return st.estimate()
+
+    def progress(self, index, step_fraction, size=None):
+        # Time-weighted overall fraction: each stage counts by its expected duration
+        means = [self.expected(k, size)[0] for k in pipeline.STEP_KEYS]
+        total = sum(means) or 1.0
+        if index >= len(means): return 1.0
+        return min(1.0, (sum(means[:index]) + max(0.0, min(1.0, step_fraction)) * means[index]) / total)
+
+    def remaining(self, index, step_elapsed, size=None):
+        """(expected, low, high) seconds until the whole workflow completes."""
+        mean = lo = hi = 0.0
+        for i, k in enumerate(pipeline.STEP_KEYS[index:], start=index):
+            m, l, h = self.expected(k, size)
+            if i == index:
+                m, l, h = max(0.0, m - step_elapsed), max(0.0, l - step_elapsed), max(0.0, h - step_elapsed)
+            mean += m; lo += l; hi += h
+        return mean, lo, max(hi, mean)
@@ -0,0 +1,212 @@
+# event_replay.py — record and replay pipeline event streams (deterministic GUI load)
+# - Recorder: every event published on a bus -> gzip JSONL (events.Event.to_dict, ts relative to the
+#   first event); the GUIs record their runs when STORYMORPH_RECORD names a directory
+# - read_events(): a recording, or batch_runner.py's JSONL event output (absolute ts)
+# - synthetic(): pipeline-shaped stream with a chosen log rate and burstiness (e.g. 10k lines/min)
+# - replay(): publishes a stream at 1x, Nx or as fast as possible, with timestamps moved to the
+#   time of delivery; the GUIs replay instead of running the pipeline when STORYMORPH_REPLAY is set
+#   ("synthetic[:LOGS_PER_MIN[:SECONDS]]" or a file; speed from STORYMORPH_REPLAY_SPEED: 1, N or max)
+# - FrameStats: frame / rerun durations for gui_bench.py
+
+import gzip, json, os, random, threading, time
+from array import array
+from datetime import datetime
+from heapq import merge
+
+import pipeline
+from events import Event, StepStarted, StepProgress, StepFinished, LogRecord
+
+FORMAT = 1
+FLUSH_INTERVAL = 1.0        # s between flushes of a recording (a killed process loses at most this much)
+FRAME_BUDGET = 1 / 60       # s; frames / reruns slower than this count as janky
+LEVEL_MIX = (("INFO", 0.85), ("SUCCESS", 0.05), ("WARNING", 0.07), ("ERROR", 0.03))
+MESSAGES = (
+    "chunk {n}: {kb} KiB in {ms} ms",
+    "scene {n}: prompt tokens {kb}, completion {ms}",
+    "retrying request {n} after {ms} ms (upstream busy)",
+    "cache miss for asset {n}; fetching {kb} KiB",
+    "rendered frame batch {n} ({ms} ms)",
+)
+
+
+# ---------------- Recording ----------------
+def _encode(ev, t0):
+    d = ev.to_dict(); d["ts"] = round(ev.ts - t0, 4)
+    return json.dumps(d, separators=(",", ":")) + "\n"
+
+
+def recording_path(directory, name):
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{name}-{datetime.now():%Y%m%d-%H%M%S}.jsonl.gz")
+
+
+def write_recording(stream, path):
+    """Write (offset, event) pairs as a recording; returns the number of events."""
+    n = 0
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+        f.write(json.dumps({"recording": FORMAT, "t0": time.time()}) + "\n")
+        for off, ev in stream:
+            ev.ts = off; f.write(_encode(ev, 0.0)); n += 1
+    return n
+
+
+class Recorder:
+    """Writes every event published on `bus` from its own thread; close() finishes the file."""
+
+    def __init__(self, bus, path, flush_interval=FLUSH_INTERVAL):
+        self.path, self.flush_interval = path, flush_interval
+        self.count = 0
+        self._sub = bus.subscribe(maxsize=65536)
+        self._f = gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="event-recorder", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        t0 = None; next_flush = time.monotonic() + self.flush_interval
+        while True:
+            self._sub.wait(0.1)
+            for ev in self._sub.drain():
+                if t0 is None:
+                    t0 = ev.ts; self._f.write(json.dumps({"recording": FORMAT, "t0": t0}) + "\n")
+                self._f.write(_encode(ev, t0)); self.count += 1
+            if self._done.is_set() and not len(self._sub): break
+            if time.monotonic() >= next_flush:
+                self._f.flush(); next_flush = time.monotonic() + self.flush_interval
+        self._sub.close(); self._f.close()
+
+    def close(self, timeout=5.0):
+        self._done.set(); self._thread.join(timeout)
+
+
+def recorder_from_env(bus, name):
+    directory = os.environ.get("STORYMORPH_RECORD")
+    return Recorder(bus, recording_path(directory, name)) if directory else None
+
+
+def read_events(path):
+    """(offset s, Event) pairs from a recording or from batch_runner's JSONL output, in file order."""
+    with open(path, "rb") as f: gz = f.read(2) == b"\x1f\x8b"
+    relative, t0 = False, None
+    with (gzip.open(path, "rt", encoding="utf-8") if gz else open(path, encoding="utf-8")) as f:
+        try:
+            for line in f:
+                if not line.strip(): continue
+                d = json.loads(line)
+                if "recording" in d: relative = True; continue
+                ev = Event.from_dict(d)
+                if t0 is None: t0 = 0.0 if relative else ev.ts
+                yield ev.ts - t0, ev
+        except EOFError:
+            pass        # recording cut short (process killed before close); replay what is there
+
+
+# ---------------- Synthetic load ----------------
+def synthetic(duration=60.0, logs_per_min=10_000, jobs=1, progress_hz=10.0, burst=20, seed=0):
+    """Each job walks through every step over `duration` s, reporting progress at progress_hz; log lines
+    arrive at logs_per_min in total, in bursts of 1..burst lines 1 ms apart. Deterministic for a seed."""
+    rnd = random.Random(seed)
+    weights = [s["duration"] for s in pipeline.STEPS]
+    spans = [duration * w / sum(weights) for w in weights]
+    levels, level_weights = zip(*LEVEL_MIX)
+
+    def step_at(t):
+        for i, span in enumerate(spans):
+            if t < span: return i
+            t -= span
+        return len(spans) - 1
+
+    def job_events(job):
+        out = [(0.0, LogRecord(job, None, None, "INFO", "Replay: synthetic job started", ts=0.0))]
+        t = 0.0
+        for i, (step, span) in enumerate(zip(pipeline.STEPS, spans)):
+            key = step["key"]
+            out.append((t, StepStarted(job, key, i, ts=t)))
+            n = max(1, int(span * progress_hz))
+            out += [(t + span * k / n, StepProgress(job, key, i, k / n, ts=t + span * k / n)) for k in range(1, n + 1)]
+            out.append((t + span, StepFinished(job, key, i, StepFinished.DONE, span, ts=t + span)))
+            out.append((t + span, LogRecord(job, key, i, "SUCCESS", f"{step['title']} completed.", ts=t + span)))
+            t += span
+        rate = logs_per_min / 60.0 / jobs / ((1 + burst) / 2)       # bursts per second
+        t, n = rnd.expovariate(rate) if rate > 0 else duration, 0
+        while t < duration:
+            for k in range(rnd.randint(1, burst)):
+                at = min(duration, t + k * 0.001); i = step_at(at); n += 1
+                msg = rnd.choice(MESSAGES).format(n=n, kb=rnd.randint(1, 4096), ms=rnd.randint(1, 900))
+                level = rnd.choices(levels, level_weights)[0]
+                out.append((at, LogRecord(job, pipeline.STEP_KEYS[i], i, level, msg, ts=at)))
+            t += rnd.expovariate(rate)
+        out.sort(key=lambda p: p[0])        # stable: a step's events keep their order
+        out.append((duration, LogRecord(job, None, None, "SUCCESS", "Workflow completed.", ts=duration)))
+        return out
+
+    return merge(*(job_events(j) for j in range(jobs)), key=lambda p: p[0])
+
+
+def open_source(spec):
+    """'synthetic[:LOGS_PER_MIN[:SECONDS]]' or a recording / event file."""
+    if spec.startswith("synthetic"):
+        parts = spec.split(":")[1:]
+        return synthetic(duration=float(parts[1]) if len(parts) > 1 else 60.0,
+                         logs_per_min=float(parts[0]) if parts else 10_000)
+    return read_events(spec)
+
+
+def parse_speed(text):
+    text = str(text).strip().lower()
+    return 0.0 if text in ("max", "0", "") else float(text.rstrip("x"))
+
+
+def source_from_env():
+    """(stream, speed) when STORYMORPH_REPLAY is set, else None."""
+    spec = os.environ.get("STORYMORPH_REPLAY")
+    return (open_source(spec), parse_speed(os.environ.get("STORYMORPH_REPLAY_SPEED", "1"))) if spec else None
+
+
+# ---------------- Replay ----------------
+def replay(stream, publish, speed=1.0, stop=None):
+    """Publish (offset, event) pairs in order: in real time (speed 1), N times faster, or as fast as
+    possible (0). Timestamps become the time of delivery, so clocks and time filters behave as live.
+    `stop` is a CancelToken / threading.Event. Returns the number of events published."""
+    t0, w0, first, n = time.monotonic(), time.time(), None, 0
+    for off, ev in stream:
+        if first is None: first = off
+        off -= first
+        if speed:
+            due = t0 + off / speed
+            while (delay := due - time.monotonic()) > 0:
+                if stop is not None and stop.is_set(): return n
+                time.sleep(min(delay, 0.05))
+            ev.ts = w0 + off / speed
+        else:
+            ev.ts = w0 + (time.monotonic() - t0)
+        if stop is not None and stop.is_set(): return n
+        publish(ev); n += 1
+    return n
+
+
+def replay_in_thread(stream, bus, speed=1.0, stop=None):
+    # GUI helper: stands in for pipeline.run_job_in_thread
+    t = threading.Thread(target=replay, args=(stream, bus.publish, speed, stop), name="event-replay", daemon=True)
+    t.start()
+    return t
+
+
+# ---------------- Measurement ----------------
+class FrameStats:
+    """Durations of frames (Dear PyGui) or reruns (Streamlit)."""
+
+    def __init__(self, budget=FRAME_BUDGET):
+        self.budget = budget
+        self.samples = array("d")
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def summary(self):
+        s = sorted(self.samples); n = len(s)
+        if not n: return {"count": 0}
+        ms = lambda q: round(s[min(n - 1, int(q * n))] * 1000, 2)
+        return {"count": n, "mean_ms": round(sum(s) / n * 1000, 2), "p50_ms": ms(0.5), "p95_ms": ms(0.95),
+                "p99_ms": ms(0.99), "max_ms": round(s[-1] * 1000, 2),
+                "over_budget": sum(1 for x in s if x > self.budget)}
@@ -0,0 +1,157 @@
+# events.py — typed pipeline events + publish/subscribe bus
+# - Compact __slots__ records: StepStarted, StepProgress, StepFinished, LogRecord, TransferProgress
+# - EventBus fans out to bounded per-subscriber queues; publish() never blocks
+# - Backpressure policy per record type:
+#     DROP_OLDEST (progress)          -> bounded lane, oldest entries evicted when full
+#     NEVER_DROP  (state transitions) -> kept even past the bound (counted as overflow)
+#   so a slow renderer can lose intermediate progress values but never a step change or a log line.
+
+import threading, time
+from collections import deque
+from itertools import count
+
+DROP_OLDEST = "drop_oldest"
+NEVER_DROP = "never_drop"
+
+
+# ---------------- Records ----------------
+class Event:
+    __slots__ = ("ts", "job", "step", "index")
+    kind = "event"
+    policy = NEVER_DROP
+
+    def __init__(self, job, step, index, ts=None):
+        self.ts = time.time() if ts is None else ts
+        self.job = job; self.step = step; self.index = index
+
+    def to_dict(self):
+        d = {"event": self.kind}
+        for cls in reversed(type(self).__mro__):
+            for name in getattr(cls, "__slots__", ()):
+                d[name] = getattr(self, name)
+        return d
+
+    @staticmethod
+    def from_dict(d):
+        d = dict(d); cls = EVENT_TYPES[d.pop("event")]
+        return cls(**d)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()})"
+
+
+class StepStarted(Event):
+    __slots__ = ()
+    kind = "step_started"
+
+
+class StepProgress(Event):
+    __slots__ = ("value",)
+    kind = "step_progress"
+    policy = DROP_OLDEST
+
+    def __init__(self, job, step, index, value, ts=None):
+        super().__init__(job, step, index, ts); self.value = value
+
+
+class StepFinished(Event):
+    __slots__ = ("status", "elapsed", "reason")
+    kind = "step_finished"
+    DONE, FAILED, CANCELLED = "done", "failed", "cancelled"
+
+    def __init__(self, job, step, index, status, elapsed=0.0, reason=None, ts=None):
+        super().__init__(job, step, index, ts)
+        self.status = status; self.elapsed = elapsed; self.reason = reason
+
+    @property
+    def ok(self): return self.status == self.DONE
+
+
+class LogRecord(Event):
+    __slots__ = ("level", "msg")
+    kind = "log"
+
+    def __init__(self, job, step, index, level, msg, ts=None):
+        super().__init__(job, step, index, ts); self.level = level; self.msg = msg
+
+
+class TransferProgress(Event):
+    """Bytes of one upload sent to one destination (uploads.py). `rate` is the recent throughput in B/s,
+    the transfer's average once `done`; the final record is never dropped."""
+    __slots__ = ("dest", "sent", "total", "rate", "done")
+    kind = "transfer_progress"
+
+    def __init__(self, job, step, index, dest, sent, total, rate=0.0, done=False, ts=None):
+        super().__init__(job, step, index, ts)
+        self.dest = dest; self.sent = sent; self.total = total; self.rate = rate; self.done = done
+
+    @property
+    def policy(self): return NEVER_DROP if self.done else DROP_OLDEST
+
+
+EVENT_TYPES = {c.kind: c for c in (StepStarted, StepProgress, StepFinished, LogRecord, TransferProgress)}
+
+
+# ---------------- Bus ----------------
+class Subscription:
+    """Per-subscriber queue with two lanes merged back into publish order on drain()."""
+
+    def __init__(self, bus, maxsize=256, kinds=None):
+        self._bus = bus
+        self.maxsize = maxsize
+        self.kinds = frozenset(kinds) if kinds else None
+        self._lossy = deque(maxlen=maxsize)   # (seq, ev) for DROP_OLDEST records
+        self._keep = deque()                  # (seq, ev) for NEVER_DROP records
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self.dropped = 0     # progress records evicted
+        self.overflow = 0    # state records kept past maxsize
+
+    def _offer(self, seq, ev):
+        if self.kinds is not None and ev.kind not in self.kinds: return
+        with self._lock:
+            if ev.policy == DROP_OLDEST:
+                if len(self._lossy) == self.maxsize: self.dropped += 1
+                self._lossy.append((seq, ev))
+            else:
+                if len(self._keep) >= self.maxsize: self.overflow += 1
+                self._keep.append((seq, ev))
+        self._ready.set()
+
+    def __len__(self):
+        return len(self._lossy) + len(self._keep)
+
+    def drain(self, max_items=None):
+        out = []
+        with self._lock:
+            a, b = self._lossy, self._keep
+            while (a or b) and (max_items is None or len(out) < max_items):
+                if b and (not a or b[0][0] < a[0][0]): out.append(b.popleft()[1])
+                else: out.append(a.popleft()[1])
+            if not a and not b: self._ready.clear()
+        return out
+
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def close(self):
+        self._bus.unsubscribe(self)
+
+
+class EventBus:
+    def __init__(self):
+        self._subs = ()
+        self._lock = threading.Lock()
+        self._seq = count()
+
+    def subscribe(self, maxsize=256, kinds=None):
+        sub = Subscription(self, maxsize, kinds)
+        with self._lock: self._subs = self._subs + (sub,)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock: self._subs = tuple(s for s in self._subs if s is not sub)
+
+    def publish(self, ev):
+        seq = next(self._seq)
+        for sub in self._subs: sub._offer(seq, ev)
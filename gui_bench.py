@@ -0,0 +1,90 @@
+# gui_bench.py — GUI performance under a replayed event stream (event_replay.py)
+# - synth:     write a synthetic recording (log rate, burstiness, jobs, duration)
+# - streamlit: runs streamlit_gui.py headless (streamlit.testing AppTest), starts one run and reruns it at
+#              the live refresh cadence; reports the rerun cost (script time per rerun)
+# - dearpygui: launches dearpy_gui.py in benchmark mode (vsync off); reports the time per frame
+# The stream is "synthetic[:LOGS_PER_MIN[:SECONDS]]" or a recording / batch_runner.py event file.
+#
+#   python gui_bench.py synth load.jsonl.gz --logs-per-min 10000 --duration 60
+#   python gui_bench.py streamlit --replay synthetic:10000:60 --speed 1
+#   python gui_bench.py dearpygui --replay load.jsonl.gz --speed max
+
+import argparse, json, os, subprocess, sys, tempfile, time
+
+from event_replay import FrameStats, synthetic, write_recording
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RERUN_INTERVAL = 0.15       # live_clock.FAST: the cadence while events keep arriving
+
+
+def bench_streamlit(replay, speed, rerun_interval=RERUN_INTERVAL, max_seconds=600.0, timeout=60.0):
+    from streamlit.testing.v1 import AppTest
+    os.environ.update(STORYMORPH_REPLAY=replay, STORYMORPH_REPLAY_SPEED=speed)
+    at = AppTest.from_file(os.path.join(HERE, "streamlit_gui.py"), default_timeout=timeout)
+    at.run(); at.run()                                  # plain first paint, then the styled page
+    at.button(key="btn_start").click().run()
+    reruns = FrameStats(); end = time.monotonic() + max_seconds
+    while at.session_state["running"] and time.monotonic() < end:
+        time.sleep(rerun_interval)
+        t = time.perf_counter(); at.run(); reruns.add(time.perf_counter() - t)
+        if at.exception: raise RuntimeError(at.exception[0].message)
+    return {"reruns": reruns.summary(), "log_records": len(at.session_state["log_index"])}
+
+
+def bench_dearpygui(replay, speed, max_seconds=600.0):
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "bench.json")
+        env = dict(os.environ, STORYMORPH_REPLAY=replay, STORYMORPH_REPLAY_SPEED=speed, STORYMORPH_BENCH=out)
+        subprocess.run([sys.executable, os.path.join(HERE, "dearpy_gui.py")], cwd=HERE, env=env,
+                       timeout=max_seconds, check=True)
+        with open(out) as f: return json.load(f)
+
+
+def _line(name, s):
+    if not s.get("count"): return f"{name}: no samples"
+    return (f"{name}: {s['count']}, mean {s['mean_ms']} ms, p50 {s['p50_ms']}, p95 {s['p95_ms']}, "
+            f"p99 {s['p99_ms']}, max {s['max_ms']} ms, {s['over_budget']} over 16.7 ms")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Measure GUI frame time / rerun cost under a replayed event stream.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("synth", help="write a synthetic recording")
+    p.add_argument("output", help="recording to write (.jsonl.gz)")
+    p.add_argument("--logs-per-min", type=float, default=10_000)
+    p.add_argument("--duration", type=float, default=60.0, help="seconds of stream")
+    p.add_argument("--jobs", type=int, default=1)
+    p.add_argument("--burst", type=int, default=20, help="max log lines per burst (1 = evenly spread)")
+    p.add_argument("--seed", type=int, default=0)
+
+    for name in ("streamlit", "dearpygui"):
+        p = sub.add_parser(name, help={"streamlit": "rerun cost of streamlit_gui.py",
+                                       "dearpygui": "frame time of dearpy_gui.py"}[name])
+        p.add_argument("--replay", default="synthetic:10000:60",
+                       help="recording / event file, or synthetic[:LOGS_PER_MIN[:SECONDS]] (default: 10k lines/min, 60 s)")
+        p.add_argument("--speed", default="1", help="1 (real time), N (times faster) or max")
+        p.add_argument("--max-seconds", type=float, default=600.0, help="give up after this long")
+        p.add_argument("--json", action="store_true", help="print the raw result as JSON")
+        if name == "streamlit":
+            p.add_argument("--rerun-interval", type=float, default=RERUN_INTERVAL, help="seconds between reruns")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "synth":
+        n = write_recording(synthetic(args.duration, args.logs_per_min, args.jobs, burst=args.burst, seed=args.seed),
+                            args.output)
+        print(f"{n} events, {os.path.getsize(args.output) / 1024:.0f} KiB -> {args.output}")
+        return 0
+    if args.cmd == "streamlit":
+        res = bench_streamlit(args.replay, args.speed, args.rerun_interval, args.max_seconds)
+    else:
+        res = bench_dearpygui(args.replay, args.speed, args.max_seconds)
+    if args.json: print(json.dumps(res)); return 0
+    print(f"replay: {args.replay}, speed {args.speed}")
+    print(_line("reruns" if args.cmd == "streamlit" else "frames", res.get("reruns") or res.get("frames")))
+    print(f"log records shown: {res['log_records']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+# job_queue.py — shared work table with leased claims (SQLite)
+# - Any number of worker processes, on one host or several hosts sharing the database file,
+#   claim jobs atomically (BEGIN IMMEDIATE) as time-limited leases
+# - Workers heartbeat to extend their leases; a job whose lease expires (crashed worker)
+#   becomes claimable again, up to MAX_ATTEMPTS
+# - Completion is fenced by (worker, attempt): a worker that lost its lease can't overwrite
+#   the result of the worker that took the job over
+# - The workers table carries per-worker load for the dashboard
+
+import os, socket, sqlite3, time, uuid
+
+LEASE_SECONDS = 30.0
+BUSY_TIMEOUT = 5.0  # s to wait for a locked database; capped at lease/6 so a heartbeat can't sit out its lease
+MAX_ATTEMPTS = 3
+STALE_LEASES = 3   # a worker whose heartbeat is this many leases old is shown as gone
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY,
+    prompt      TEXT NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'queued',   -- queued | running | done | failed | cancelled
+    worker      TEXT,
+    lease_until REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    created     REAL NOT NULL,
+    started     REAL,
+    finished    REAL,
+    error       TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, lease_until);
+CREATE TABLE IF NOT EXISTS workers (
+    id        TEXT PRIMARY KEY,
+    host      TEXT NOT NULL,
+    pid       INTEGER NOT NULL,
+    capacity  INTEGER NOT NULL,
+    running   INTEGER NOT NULL DEFAULT 0,
+    done      INTEGER NOT NULL DEFAULT 0,
+    failed    INTEGER NOT NULL DEFAULT 0,
+    started   REAL NOT NULL,
+    heartbeat REAL NOT NULL,
+    stopped   REAL
+);
+"""
+
+
+def new_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class JobQueue:
+    def __init__(self, path, lease=LEASE_SECONDS, wal=True):
+        self.path = path; self.lease = lease; self.wal = wal
+        busy = min(BUSY_TIMEOUT, lease / 6)
+        # autocommit mode; transactions are explicit where they matter
+        self.db = sqlite3.connect(path, timeout=busy, isolation_level=None, check_same_thread=False)
+        if wal: self.db.execute("PRAGMA journal_mode=WAL")   # use wal=False on network filesystems
+        self.db.execute(f"PRAGMA busy_timeout={int(busy * 1000)}")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _tx(self):
+        self.db.execute("BEGIN IMMEDIATE")
+
+    # ---------------- producers ----------------
+    def enqueue(self, prompts):
+        now = time.time()
+        self._tx()
+        try:
+            ids = [self.db.execute("INSERT INTO jobs (prompt, created) VALUES (?, ?)", (p, now)).lastrowid
+                   for p in prompts]
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK"); raise
+        return ids
+
+    # ---------------- workers ----------------
+    def register_worker(self, worker_id, capacity):
+        now = time.time()
+        self.db.execute("INSERT OR REPLACE INTO workers (id, host, pid, capacity, started, heartbeat) "
+                        "VALUES (?, ?, ?, ?, ?, ?)", (worker_id, socket.gethostname(), os.getpid(), capacity, now, now))
+
+    def claim(self, worker_id, n=1):
+        """Lease up to n jobs: queued ones first, then ones whose lease expired. Returns [(id, prompt, attempt)]."""
+        if n <= 0: return []
+        now = time.time()
+        self._tx()
+        try:
+            # expired leases that used up their attempts are failed instead of handed out again
+            self.db.execute("UPDATE jobs SET status='failed', finished=?, error='lease expired too many times' "
+                            "WHERE status='running' AND lease_until < ? AND attempts >= ?", (now, now, MAX_ATTEMPTS))
+            rows = self.db.execute(
+                "SELECT id, prompt, attempts FROM jobs WHERE status='queued' "
+                "OR (status='running' AND lease_until < ?) ORDER BY id LIMIT ?", (now, n)).fetchall()
+            for job_id, _, attempts in rows:
+                self.db.execute("UPDATE jobs SET status='running', worker=?, lease_until=?, attempts=?, started=? "
+                                "WHERE id=?", (worker_id, now + self.lease, attempts + 1, now, job_id))
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK"); raise
+        return [(job_id, prompt, attempts + 1) for job_id, prompt, attempts in rows]
+
+    def heartbeat(self, worker_id, leases, running=None):
+        """Extend leases [(job_id, attempt)]; returns the subset this worker no longer holds."""
+        now = time.time(); lost = []
+        self._tx()
+        try:
+            for job_id, attempt in leases:
+                cur = self.db.execute("UPDATE jobs SET lease_until=? WHERE id=? AND worker=? AND attempts=? "
+                                      "AND status='running'", (now + self.lease, job_id, worker_id, attempt))
+                if cur.rowcount == 0: lost.append((job_id, attempt))
+            self.db.execute("UPDATE workers SET heartbeat=?, running=? WHERE id=?",
+                            (now, len(leases) - len(lost) if running is None else running, worker_id))
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK"); raise
+        return lost
+
+    def finish(self, worker_id, job_id, attempt, status, error=None):
+        """Record the outcome if this worker still holds the lease. 'cancelled' puts the job back in the queue."""
+        now = time.time()
+        self._tx()
+        try:
+            if status == "cancelled":
+                cur = self.db.execute("UPDATE jobs SET status='queued', worker=NULL, lease_until=NULL "
+                                      "WHERE id=? AND worker=? AND attempts=? AND status='running'",
+                                      (job_id, worker_id, attempt))
+            else:
+                cur = self.db.execute("UPDATE jobs SET status=?, finished=?, error=?, lease_until=NULL "
+                                      "WHERE id=? AND worker=? AND attempts=? AND status='running'",
+                                      (status, now, error, job_id, worker_id, attempt))
+            held = cur.rowcount == 1
+            if held and status in ("done", "failed"):
+                self.db.execute(f"UPDATE workers SET {status}={status}+1 WHERE id=?", (worker_id,))
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK"); raise
+        return held
+
+    def unregister_worker(self, worker_id):
+        self.db.execute("UPDATE workers SET stopped=?, running=0 WHERE id=?", (time.time(), worker_id))
+
+    # ---------------- dashboard ----------------
+    def counts(self):
+        return dict(self.db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def workers(self, include_stopped=False):
+        now = time.time()
+        rows = self.db.execute("SELECT id, host, pid, capacity, running, done, failed, started, heartbeat, stopped "
+                               "FROM workers ORDER BY started").fetchall()
+        out = []
+        for r in rows:
+            w = dict(zip(("id", "host", "pid", "capacity", "running", "done", "failed", "started", "heartbeat",
+                          "stopped"), r))
+            w["heartbeat_age"] = now - w["heartbeat"]
+            w["alive"] = w["stopped"] is None and w["heartbeat_age"] < STALE_LEASES * self.lease
+            w["load"] = w["running"] / w["capacity"] if w["capacity"] else 0.0
+            if w["alive"] or include_stopped: out.append(w)
+        return out
@@ -0,0 +1,167 @@
+# job_worker.py — worker mode: claim jobs from a shared work table and run them
+# - Start any number of these (same host or several hosts sharing the database)
+# - Jobs are leased (job_queue.py); leases are extended by a heartbeat, and jobs held by a
+#   crashed worker are picked up again automatically once their lease expires
+# - Ctrl+C hard-cancels the jobs in flight and hands them back to the queue
+#
+#   python job_worker.py enqueue --db jobs.sqlite prompts.txt
+#   python job_worker.py work    --db jobs.sqlite --concurrency 4 --exit-when-empty
+#   python job_worker.py status  --db jobs.sqlite
+
+import argparse, asyncio, json, signal, sqlite3, sys, time
+from concurrent.futures import ThreadPoolExecutor
+
+import pipeline
+from backend import BackendClient, DEFAULT_URL
+from batch_runner import read_prompts
+from cancellation import CancelToken
+from events import EventBus
+from job_queue import JobQueue, LEASE_SECONDS, new_worker_id
+from uploads import default_uploader
+
+POLL_INTERVAL = 1.0
+FINISH_ATTEMPTS = 3     # tries to record a job's outcome, each bounded by the queue's busy timeout
+
+
+class _QueueThread:
+    # JobQueue calls on a connection and thread of their own: a locked database delays them, not the event loop
+    def __init__(self, q):
+        self.q, self.db, self.pool = q, None, ThreadPoolExecutor(1)
+
+    async def __call__(self, method, *args, **kw):
+        def run():
+            if self.db is None: self.db = JobQueue(self.q.path, self.q.lease, self.q.wal)
+            return getattr(self.db, method)(*args, **kw)
+        return await asyncio.get_running_loop().run_in_executor(self.pool, run)
+
+    def close(self):
+        self.pool.submit(lambda: self.db is not None and self.db.close())   # after a call still running on the thread
+        self.pool.shutdown(wait=False)
+
+
+def _db_error(worker_id, what, e):
+    print(f"worker {worker_id}: {what} failed: {e}", file=sys.stderr)
+
+
+async def work(q, worker_id, concurrency=4, backend=None, time_scale=1.0, exit_when_empty=False,
+               events_out=None, stop=None, uploader=None):
+    stop = stop or CancelToken()
+    bus = EventBus()
+    sub = bus.subscribe(maxsize=65536) if events_out else None
+    inflight = {}     # (job_id, attempt) -> (task, per-job CancelToken)
+    db = _QueueThread(q)
+    await db("register_worker", worker_id, concurrency)
+
+    async def run_one(job_id, prompt, attempt, token):
+        status = await pipeline.run_job(job_id, prompt, bus, time_scale=time_scale, stop=token, backend=backend,
+                                        uploader=uploader)
+        for n in range(FINISH_ATTEMPTS):
+            try: await db("finish", worker_id, job_id, attempt, status); return
+            except sqlite3.Error as e:   # after the last attempt the lease expires and the job runs again
+                _db_error(worker_id, f"recording job {job_id} ({n + 1}/{FINISH_ATTEMPTS})", e)
+
+    async def heartbeat():
+        hdb = _QueueThread(q)    # separate from `db`: a slow claim never holds up the beat
+        try:
+            while True:
+                await asyncio.sleep(q.lease / 3)
+                leases = list(inflight)
+                try: lost = await hdb("heartbeat", worker_id, leases, running=len(leases))
+                except sqlite3.Error as e:   # try again next beat; the lease outlives two missed ones
+                    _db_error(worker_id, "heartbeat", e); continue
+                for lease in lost:   # someone else owns it now: stop duplicating the work
+                    entry = inflight.get(lease)
+                    if entry: entry[1].cancel()
+        finally:
+            hdb.close()
+
+    def flush_events():
+        if sub is None: return
+        for ev in sub.drain():
+            events_out.write(json.dumps(ev.to_dict(), separators=(",", ":")) + "\n")
+        events_out.flush()
+
+    hb = asyncio.ensure_future(heartbeat())
+    try:
+        while not stop.is_set():
+            try: claimed = await db("claim", worker_id, concurrency - len(inflight))
+            except sqlite3.Error as e:   # poll again
+                _db_error(worker_id, "claim", e); claimed = []
+            for job_id, prompt, attempt in claimed:
+                token = CancelToken()
+                task = asyncio.ensure_future(run_one(job_id, prompt, attempt, token))
+                inflight[(job_id, attempt)] = (task, token)
+                task.add_done_callback(lambda _, k=(job_id, attempt): inflight.pop(k, None))
+            flush_events()
+            if not inflight and not claimed and exit_when_empty:
+                try: counts = await db("counts")   # wait for other workers too: their jobs may come back on lease expiry
+                except sqlite3.Error as e: _db_error(worker_id, "counts", e); counts = {"queued": 1}
+                if not counts.get("queued") and not counts.get("running"): break
+            # sleep until a slot frees up (or poll for new work)
+            tasks = [t for t, _ in inflight.values()]
+            if tasks: await asyncio.wait(tasks, timeout=POLL_INTERVAL, return_when=asyncio.FIRST_COMPLETED)
+            else: await asyncio.sleep(POLL_INTERVAL)
+        # stopping: hard-cancel what's in flight; run_job reports "cancelled" -> jobs are re-queued
+        for _, token in list(inflight.values()): token.cancel()
+        if inflight: await asyncio.gather(*(t for t, _ in list(inflight.values())), return_exceptions=True)
+    finally:
+        hb.cancel()
+        flush_events()
+        try: await db("unregister_worker", worker_id)
+        except sqlite3.Error as e: _db_error(worker_id, "unregister", e)
+        db.close()
+
+
+def _print_status(q):
+    counts = q.counts()
+    print("jobs: " + ", ".join(f"{k} {counts.get(k, 0)}" for k in ("queued", "running", "done", "failed", "cancelled")))
+    for w in q.workers():
+        print(f"  {w['id']:<40} {w['running']}/{w['capacity']} running  {w['done']} done  {w['failed']} failed  "
+              f"heartbeat {w['heartbeat_age']:.1f}s ago")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Distributed pipeline workers over a shared SQLite work table.")
+    sp = ap.add_subparsers(dest="cmd", required=True)
+    e = sp.add_parser("enqueue", help="add prompts to the work table")
+    e.add_argument("prompts")
+    w = sp.add_parser("work", help="run a worker")
+    w.add_argument("-c", "--concurrency", type=int, default=4)
+    w.add_argument("--backend", default=DEFAULT_URL or None)
+    w.add_argument("--time-scale", type=float, default=1.0)
+    w.add_argument("--lease", type=float, default=LEASE_SECONDS, help="lease length in seconds")
+    w.add_argument("--exit-when-empty", action="store_true")
+    w.add_argument("--events", help="append this worker's JSONL events to a file")
+    w.add_argument("--worker-id", default=None)
+    sp.add_parser("status", help="show queue counts and per-worker load")
+    for p in (e, w, sp.choices["status"]):
+        p.add_argument("--db", default="jobs.sqlite", help="shared SQLite database (default jobs.sqlite)")
+        p.add_argument("--no-wal", action="store_true", help="rollback journal instead of WAL (network filesystems)")
+    args = ap.parse_args(argv)
+
+    q = JobQueue(args.db, lease=getattr(args, "lease", LEASE_SECONDS), wal=not args.no_wal)
+    try:
+        if args.cmd == "enqueue":
+            ids = q.enqueue(read_prompts(args.prompts)); print(f"enqueued {len(ids)} jobs")
+        elif args.cmd == "status":
+            _print_status(q)
+        else:
+            stop = CancelToken()
+            signal.signal(signal.SIGINT, lambda *_: stop.cancel())
+            worker_id = args.worker_id or new_worker_id()
+            out = open(args.events, "a", encoding="utf-8") if args.events else None
+            t0 = time.monotonic()
+            try:
+                backend = BackendClient(args.backend) if args.backend else None
+                asyncio.run(work(q, worker_id, args.concurrency, backend, args.time_scale, args.exit_when_empty, out, stop,
+                                 default_uploader(args.backend) if backend else None))
+            finally:
+                if out: out.close()
+            print(f"worker {worker_id} stopped after {time.monotonic() - t0:.1f}s", file=sys.stderr)
+    finally:
+        q.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
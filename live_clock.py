@@ -0,0 +1,66 @@
+# live_clock.py — browser-side refresh and progress animation for streamlit_gui.py
+# - The browser schedules the next rerun (components/live_clock) instead of time.sleep + st.rerun()
+# - Fast updates around step transitions and log bursts, a slow heartbeat during steady progress,
+#   no reruns at all while the tab is hidden or nothing is running
+# - The Progress Tracker bar (components/live_progress) animates itself from the step's start and
+#   expected duration; ProgressSync sends it new parameters only on transitions and corrections
+
+import os, time
+
+import streamlit.components.v1 as components
+
+FAST = 0.15                   # s between reruns right after activity / near an expected step end
+HEARTBEAT = 2.0               # s between reruns during steady progress
+ACTIVE_WINDOW = 1.0           # s after a transition / log line during which updates stay fast
+STEP_CAP = 0.99               # the browser never shows a step as finished on its own
+CORRECTION_TOLERANCE = 0.05   # step fraction the browser's estimate may be off before it is corrected
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_clock = components.declare_component("live_clock", path=os.path.join(_HERE, "components", "live_clock"))
+_progress = components.declare_component("live_progress", path=os.path.join(_HERE, "components", "live_progress"))
+
+
+def refresh_interval(running, since_activity, step_remaining=None, idle=0.0):
+    """Seconds until the next rerun; 0 disables reruns. idle: interval to use when nothing runs."""
+    if not running: return idle
+    if since_activity < ACTIVE_WINDOW: return FAST
+    if step_remaining is not None and step_remaining < ACTIVE_WINDOW: return FAST   # transition is near
+    return HEARTBEAT
+
+
+def live_clock(interval, running=False, elapsed=None, seq=0, key="live_clock"):
+    """Render the (invisible) clock; elapsed keeps the Duration text (#dur-live) ticking.
+    seq must change every run so the browser re-arms its timer."""
+    return _clock(interval=interval, running=running, elapsed=elapsed, seq=seq, key=key, default=0)
+
+
+class ProgressSync:
+    """Parameters for the browser-side progress animation. The revision only changes on a step transition,
+    start/stop, or when reported progress drifts more than `tolerance` from what the browser is showing."""
+
+    def __init__(self, tolerance=CORRECTION_TOLERANCE):
+        self.tolerance = tolerance
+        self.rev = 0
+        self._key = None                  # (index, running, weights)
+        self._ref = (0.0, 0.0)            # (step fraction, wall time it was true at)
+
+    def _predicted(self, expected, at):
+        fraction, t0 = self._ref
+        return max(fraction, min(STEP_CAP, fraction + (at - t0) / expected)) if expected > 0 else fraction
+
+    def update(self, weights, index, fraction, fraction_ts, running, now=None):
+        """weights: expected seconds per step. fraction/fraction_ts: last reported step fraction and its event time."""
+        now = now or time.time()
+        key = (index, running, tuple(round(w, 2) for w in weights))
+        if key != self._key:
+            self._key = key; self._ref = (fraction, fraction_ts or now); self.rev += 1
+        elif running and index < len(weights) and fraction_ts and fraction_ts > self._ref[1]:
+            if abs(fraction - self._predicted(weights[index], fraction_ts)) > self.tolerance:
+                self._ref = (fraction, fraction_ts); self.rev += 1
+        f0, t0 = self._ref
+        return {"weights": list(weights), "index": index, "fraction": f0,
+                "age": max(0.0, now - t0) if running else 0.0, "running": running, "rev": self.rev}
+
+
+def live_progress(params, key="live_progress"):
+    return _progress(**params, key=key, default=None)
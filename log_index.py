@@ -0,0 +1,185 @@
+# log_index.py — incremental index over log records for the Live Logs panels
+# - Append-only columns (ts / level / step / message); record ids are append positions
+# - Postings per level, per step and per message token (sorted id arrays, grown as records arrive)
+# - Queries combine levels, steps, a time range and text; text words match whole tokens, the last
+#   word matches as a prefix (search-as-you-type)
+# - Results come newest first, one page at a time (keyset paging with `before`); the most selective
+#   posting list drives the scan and the other conditions are checked per record, so a first page
+#   over ~1M records costs milliseconds instead of a full scan
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from heapq import merge
+
+TOKEN_RE = re.compile(r"[0-9a-z]+")
+PREFIX_EXPAND = 2048   # a prefix matching more tokens than this is checked per record instead
+PREFIX_PROBE = 8       # up to this many prefix tokens are checked by posting lookups, more by re-tokenizing
+VOCAB_RUN = 512        # new tokens are kept unsorted until there are this many, then become a sorted run
+OOO_SLACK = 5.0        # s; records may arrive this much out of timestamp order (several producers)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def _desc(postings, hi):
+    """Ids in a sorted posting array below hi, newest first."""
+    for k in range(bisect_left(postings, hi) - 1, -1, -1):
+        yield postings[k]
+
+
+def _unique(ids):
+    """Drop repeats from a merged newest-first stream (a record is in the posting list of every token it has)."""
+    last = None
+    for rid in ids:
+        if rid != last: yield rid
+        last = rid
+
+
+def _contains(postings, rid):
+    k = bisect_left(postings, rid)
+    return k < len(postings) and postings[k] == rid
+
+
+class LogIndex:
+    def __init__(self):
+        self.ts = array("d"); self.ts_max = array("d")   # ts_max: running maximum, for time bisects
+        self.level = array("B"); self.step = array("B")
+        self.msg = []
+        self.levels = {}; self.steps = {None: 0}         # name -> small int code
+        self._level_names = []; self._step_names = [None]
+        self.by_level = []; self.by_step = [array("I")]
+        self.tokens = {}                                 # token -> array("I")
+        self._vocab_runs = []; self._vocab_new = []      # vocabulary for prefix search: sorted runs + recent tokens
+
+    def __len__(self):
+        return len(self.msg)
+
+    # ---------------- ingest ----------------
+    def _code(self, table, names, postings, key):
+        code = table.get(key)
+        if code is None:
+            code = table[key] = len(names); names.append(key); postings.append(array("I"))
+        return code
+
+    def add(self, ts, level, step, msg):
+        rid = len(self.msg)
+        lv = self._code(self.levels, self._level_names, self.by_level, level)
+        sp = self._code(self.steps, self._step_names, self.by_step, step)
+        self.ts.append(ts); self.ts_max.append(max(ts, self.ts_max[-1]) if rid else ts)
+        self.level.append(lv); self.step.append(sp); self.msg.append(msg)
+        self.by_level[lv].append(rid); self.by_step[sp].append(rid)
+        for tok in set(tokenize(msg)):
+            p = self.tokens.get(tok)
+            if p is None:
+                p = self.tokens[tok] = array("I"); self._vocab_new.append(tok)
+                if len(self._vocab_new) >= VOCAB_RUN: self._seal_vocab()
+            p.append(rid)
+        return rid
+
+    def _seal_vocab(self):
+        # Runs of geometrically growing size (merge while the previous run is at most twice as big):
+        # O(log n) amortized per new token, O(log n) runs to bisect per prefix lookup
+        runs = self._vocab_runs
+        runs.append(sorted(self._vocab_new)); self._vocab_new = []
+        while len(runs) > 1 and len(runs[-2]) <= 2 * len(runs[-1]):
+            last = runs.pop(); runs[-1].extend(last); runs[-1].sort()   # two sorted runs: a linear merge
+
+    def record(self, rid):
+        """(ts, level, step, msg)"""
+        return self.ts[rid], self._level_names[self.level[rid]], self._step_names[self.step[rid]], self.msg[rid]
+
+    # ---------------- query ----------------
+    def _prefix_tokens(self, prefix):
+        out = [t for t in self._vocab_new if t.startswith(prefix)]
+        for run in self._vocab_runs:
+            out += run[bisect_left(run, prefix): bisect_left(run, prefix + "\uffff")]
+        return out
+
+    def _plan(self, levels, steps, text):
+        """-> (level codes, step codes, postings per exact word, prefix word, postings of its expansions)
+        Codes are None when unconstrained; the expansion is None when the prefix matches too many tokens."""
+        lv = None if not levels else {self.levels[l] for l in levels if l in self.levels}
+        sp = None if not steps else {self.steps[s] for s in steps if s in self.steps}
+        words = tokenize(text or "")
+        exact, prefix = words[:-1], (words[-1] if words else None)
+        if prefix is not None and re.search(r"\w$", text or "") is None:
+            exact, prefix = words, None                  # trailing space: the last word is complete
+        exact_lists = [self.tokens.get(w) for w in dict.fromkeys(exact)]
+        prefix_lists = None
+        if prefix is not None:
+            toks = self._prefix_tokens(prefix)
+            if len(toks) <= PREFIX_EXPAND: prefix_lists = [self.tokens[t] for t in toks]
+        return lv, sp, exact_lists, prefix, prefix_lists
+
+    def search(self, levels=None, steps=None, since=None, until=None, text=None, limit=200, before=None):
+        """Ids of matching records, newest first; pass the last id of a page as `before` for the next."""
+        lv, sp, exact_lists, prefix, prefix_lists = self._plan(levels, steps, text)
+        if lv == set() or sp == set() or any(p is None for p in exact_lists) or prefix_lists == []:
+            return []
+        lo = 0 if since is None else bisect_left(self.ts_max, since)
+        hi = len(self.msg) if until is None else bisect_right(self.ts_max, until + OOO_SLACK)
+        if before is not None: hi = min(hi, before)
+        if hi <= lo: return []
+
+        # drive from the smallest candidate set; everything else is checked per record
+        drivers = [(len(p), "tok", p) for p in exact_lists]
+        if prefix_lists is not None: drivers.append((sum(map(len, prefix_lists)), "prefix", prefix_lists))
+        if lv is not None:
+            drivers.append((sum(len(self.by_level[c]) for c in lv), "level", [self.by_level[c] for c in lv]))
+        if sp is not None:
+            drivers.append((sum(len(self.by_step[c]) for c in sp), "step", [self.by_step[c] for c in sp]))
+        drivers.sort(key=lambda d: d[0])
+        kind = src = None
+        if not drivers or drivers[0][0] >= hi - lo:
+            candidates = range(hi - 1, lo - 1, -1)
+        else:
+            _, kind, src = drivers[0]
+            candidates = (_desc(src, hi) if kind == "tok" else
+                          _unique(merge(*(_desc(p, hi) for p in src), reverse=True)))
+
+        out = []
+        ts, level, step, msg = self.ts, self.level, self.step, self.msg
+        check_tokens = [p for p in exact_lists if not (kind == "tok" and p is src)]
+        check_prefix = None if kind == "prefix" else prefix_lists
+        prefix_verify = None
+        if prefix is not None and (check_prefix is None or len(check_prefix) > PREFIX_PROBE) and kind != "prefix":
+            prefix_verify, check_prefix = prefix, None
+        for rid in candidates:
+            if rid < lo: break
+            if since is not None and ts[rid] < since: continue
+            if until is not None and ts[rid] > until: continue
+            if lv is not None and kind != "level" and level[rid] not in lv: continue
+            if sp is not None and kind != "step" and step[rid] not in sp: continue
+            if any(not _contains(p, rid) for p in check_tokens): continue
+            if check_prefix is not None and not any(_contains(p, rid) for p in check_prefix): continue
+            if prefix_verify is not None and not any(t.startswith(prefix_verify) for t in tokenize(msg[rid])): continue
+            out.append(rid)
+            if len(out) >= limit: break
+        return out
+
+    def matches(self, rid, levels=None, steps=None, since=None, until=None, text=None):
+        """Does one (typically just added) record satisfy the query?"""
+        t, lvl, stp, m = self.record(rid)
+        if levels and lvl not in levels: return False
+        if steps and stp not in steps: return False
+        if since is not None and t < since: return False
+        if until is not None and t > until: return False
+        words = tokenize(text or "")
+        if not words: return True
+        toks = set(tokenize(m))
+        exact, last = words[:-1], words[-1]
+        if re.search(r"\w$", text) is None: exact, last = words, None
+        return all(w in toks for w in exact) and (last is None or any(t.startswith(last) for t in toks))
+
+
+if __name__ == "__main__":
+    # python log_index.py — regression checks
+    ix = LogIndex()
+    ix.add(1.0, "INFO", None, "run running")        # two tokens under the prefix "ru"
+    for i in range(100): ix.add(2.0 + i, "INFO", None, "other")   # so the prefix postings drive the scan
+    assert ix.search(text="ru") == [0], ix.search(text="ru")
+    assert ix.search(text="ru", since=0.0, until=500.0) == [0]
+    assert ix.search(levels=["INFO"], text="ru") == [0]
+    print("ok")
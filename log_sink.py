@@ -0,0 +1,118 @@
+# log_sink.py — structured log export (JSON lines) off the caller's thread
+# - emit() is a bounded in-memory enqueue; a writer thread serializes and writes in batches
+# - The active file rotates by size or age; rotated files are gzip-compressed on a separate thread
+#   and only the newest `backups` archives are kept
+# - When the disk can't keep up, the buffer stays bounded: new records are dropped and counted
+#   (stats()["dropped"]) instead of blocking the pipeline or the UI
+# - Location: STORYMORPH_LOG_DIR or ~/.storymorph/logs ("off" disables the default sink)
+
+import glob, gzip, json, os, shutil, threading, time
+from collections import deque
+from datetime import datetime
+
+DEFAULT_DIR = os.environ.get("STORYMORPH_LOG_DIR", os.path.join(os.path.expanduser("~"), ".storymorph", "logs"))
+FLUSH_INTERVAL = 0.5        # s between writer wake-ups
+MAX_BYTES = 64 << 20        # rotate the active file past this size ...
+MAX_AGE = 3600.0            # ... or this age (s)
+CAPACITY = 50_000           # records buffered before new ones are dropped
+BACKUPS = 48                # compressed archives kept per sink name
+
+
+class LogSink:
+    def __init__(self, directory=DEFAULT_DIR, name="storymorph", max_bytes=MAX_BYTES, max_age=MAX_AGE,
+                 capacity=CAPACITY, flush_interval=FLUSH_INTERVAL, backups=BACKUPS):
+        self.directory, self.name = directory, name
+        self.max_bytes, self.max_age, self.capacity = max_bytes, max_age, capacity
+        self.flush_interval, self.backups = flush_interval, backups
+        self.path = os.path.join(directory, f"{name}.jsonl")
+        self._q = deque()
+        self._wake = threading.Event(); self._closing = False
+        self.written = self.dropped = self.rotations = 0
+        self._f = None; self._size = 0; self._opened = 0.0
+        self._archive_q = deque(); self._archive_wake = threading.Event()
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path) and os.path.getsize(self.path): self._rotate_file()   # left by a crashed run
+        self._writer = threading.Thread(target=self._run, name=f"log-sink-{name}", daemon=True)
+        self._archiver = threading.Thread(target=self._archive_loop, name=f"log-archive-{name}", daemon=True)
+        self._writer.start(); self._archiver.start()
+
+    # ---------------- producers (any thread) ----------------
+    def emit(self, ts, level, msg, step=None, job=None, **extra):
+        """Enqueue one record; returns False (and counts it) when the buffer is full."""
+        if len(self._q) >= self.capacity or self._closing:
+            self.dropped += 1; return False
+        self._q.append((ts, level, msg, step, job, extra))
+        return True
+
+    def stats(self):
+        return {"written": self.written, "dropped": self.dropped, "queued": len(self._q),
+                "rotations": self.rotations, "file": self.path}
+
+    def close(self, timeout=5.0):
+        """Flush what is buffered (bounded by timeout) and stop both threads."""
+        self._closing = True; self._wake.set()
+        self._writer.join(timeout)
+        self._archive_wake.set(); self._archiver.join(timeout)
+
+    # ---------------- writer thread ----------------
+    def _open(self):
+        self._f = open(self.path, "a", encoding="utf-8")
+        self._size = self._f.tell(); self._opened = time.time()
+
+    def _rotate_file(self):
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        rotated = os.path.join(self.directory, f"{self.name}-{stamp}.jsonl")
+        os.replace(self.path, rotated)
+        self._archive_q.append(rotated); self._archive_wake.set()
+        self.rotations += 1
+
+    def _run(self):
+        q = self._q
+        while True:
+            self._wake.wait(self.flush_interval); self._wake.clear()
+            closing = self._closing
+            lines = []
+            while q:
+                ts, level, msg, step, job, extra = q.popleft()
+                rec = {"ts": round(ts, 6), "level": level, "msg": msg}
+                if step is not None: rec["step"] = step
+                if job is not None: rec["job"] = job
+                if extra: rec.update(extra)
+                lines.append(json.dumps(rec, ensure_ascii=False, separators=(",", ":")))
+                if len(lines) >= 4096: break          # keep rotation checks and memory per batch bounded
+            if lines:
+                if self._f is None: self._open()
+                data = "\n".join(lines) + "\n"
+                self._f.write(data); self._f.flush()
+                self._size += len(data); self.written += len(lines)
+            if self._f is not None and (self._size >= self.max_bytes or time.time() - self._opened >= self.max_age):
+                self._f.close(); self._f = None
+                self._rotate_file()
+            if q: self._wake.set()                      # more buffered than one batch
+            elif closing: break
+        if self._f is not None: self._f.close(); self._f = None
+
+    # ---------------- archiver thread ----------------
+    def _archive_loop(self):
+        while True:
+            self._archive_wake.wait(); self._archive_wake.clear()
+            while self._archive_q:
+                src = self._archive_q.popleft()
+                try:
+                    with open(src, "rb") as fi, gzip.open(src + ".gz", "wb", compresslevel=6) as fo:
+                        shutil.copyfileobj(fi, fo, 1 << 20)
+                    os.remove(src)
+                except OSError:
+                    pass                                # leave the plain file; nothing is lost
+            archives = sorted(glob.glob(os.path.join(self.directory, f"{self.name}-*.jsonl.gz")))
+            for old in archives[:-self.backups] if self.backups else []:
+                try: os.remove(old)
+                except OSError: pass
+            if self._closing and not self._writer.is_alive() and not self._archive_q: return
+
+
+def default_sink(name):
+    """Process-wide sink in DEFAULT_DIR, or None when disabled / not writable."""
+    if DEFAULT_DIR.lower() == "off": return None
+    try: return LogSink(DEFAULT_DIR, name)
+    except OSError: return None
@@ -0,0 +1,195 @@
+# pipeline.py — GUI-agnostic workflow engine
+# - Single definition of the workflow steps (shared by the GUIs and the headless runner)
+# - Async job runner that publishes typed events (events.py) on an EventBus
+# - Stages run against the backend (backend.py) when one is given, else they are simulated
+# - Upload publishes the video File Download returned to every destination at once (uploads.py) when an
+#   uploader is given and that file exists on this machine; otherwise it is a backend stage like the others
+# - Hard cancellation through cancellation.CancelToken: in-flight requests are aborted,
+#   and the backend is told to cancel the job within a deadline
+# - No Streamlit or Dear PyGui imports here
+
+import asyncio
+import os
+import threading
+import time
+
+from backend import BackendError
+from cancellation import CLEANUP_DEADLINE
+from events import StepStarted, StepProgress, StepFinished, LogRecord, TransferProgress
+
+# ---------------- Steps ----------------
+# "upstream" names the rate-limited service behind a stage (ratelimit.py)
+STEPS = [
+    {"key": "story_creation",       "title": "Story Creation",       "desc": "Generating story using ChatGPT API", "duration": 3.0, "upstream": "chatgpt"},
+    {"key": "image_generation",     "title": "Image Generation",     "desc": "Creating visual content",            "duration": 3.0, "upstream": "images"},
+    {"key": "narration_generation", "title": "Narration Generation", "desc": "Generating voice narration",         "duration": 3.0, "upstream": "tts"},
+    {"key": "caption_generation",   "title": "Caption Generation",   "desc": "Creating subtitles and captions",    "duration": 3.0, "upstream": "captions"},
+    {"key": "file_download",        "title": "File Download",        "desc": "Downloading completed video file",   "duration": 3.0, "upstream": "backend"},
+    {"key": "upload",               "title": "Upload",               "desc": "Publishing to social media",         "duration": 4.0, "upstream": "uploads"},
+]
+STEP_KEYS = [s["key"] for s in STEPS]
+
+TICK = 0.03               # simulated work granularity (seconds)
+PROGRESS_INTERVAL = 0.1   # min seconds between progress events of one step
+
+
+class StepFailed(Exception):
+    pass
+
+
+class Stopped(Exception):
+    pass
+
+
+# ---------------- Event helpers ----------------
+def _started(job, i):           return StepStarted(job, STEP_KEYS[i], i)
+def _progress(job, i, value):   return StepProgress(job, STEP_KEYS[i], i, round(value, 4))
+def _finished(job, i, status, elapsed, reason=None):
+    return StepFinished(job, STEP_KEYS[i], i, status, elapsed, reason)
+def _log(job, level, msg, i=None):
+    return LogRecord(job, STEP_KEYS[i] if i is not None else None, i, level, msg)
+
+
+# ---------------- Stages ----------------
+async def _simulate_step(job, index, publish, time_scale, stop):
+    # Stand-in for the real backend call: advance in TICK slices, throttle progress events
+    duration = STEPS[index]["duration"] * time_scale
+    started = time.monotonic(); last_emit = 0.0
+    while True:
+        if stop is not None and stop.is_set(): raise Stopped()
+        elapsed = time.monotonic() - started
+        pct = 1.0 if duration <= 0 else min(1.0, elapsed / duration)
+        if pct >= 1.0 or elapsed - last_emit >= PROGRESS_INTERVAL:
+            publish(_progress(job, index, pct)); last_emit = elapsed
+        if pct >= 1.0: return
+        await asyncio.sleep(min(TICK, duration - elapsed))
+
+
+async def _backend_step(job, index, publish, request):
+    # Real stage: one backend request; progress is estimated from the nominal duration while it runs
+    duration = STEPS[index]["duration"]
+    req = asyncio.ensure_future(request)
+    started = time.monotonic()
+    try:
+        while not req.done():
+            await asyncio.wait({req}, timeout=PROGRESS_INTERVAL)
+            publish(_progress(job, index, min(0.95, (time.monotonic() - started) / duration)))
+        result = req.result()
+    except BackendError as e:
+        raise StepFailed(f"backend returned HTTP {e.status}") from e
+    except OSError as e:
+        raise StepFailed(f"backend unreachable ({e})") from e
+    finally:
+        req.cancel()   # no-op when done; aborts the request when we are being cancelled
+    publish(_progress(job, index, 1.0))
+    return result
+
+
+async def _upload_step(job, index, publish, uploader, path):
+    # Client-side Upload: every destination at once, progress and throughput per destination
+    key, last = STEP_KEYS[index], {}
+
+    def report(transfers):
+        for t in transfers:
+            finished = t.finished is not None and not t.error
+            if last.get(t.dest) == (t.sent, finished): continue
+            last[t.dest] = (t.sent, finished)
+            publish(TransferProgress(job, key, index, t.dest, t.sent, t.total, round(t.rate()), finished))
+        publish(_progress(job, index, sum(t.sent for t in transfers) / max(1, sum(t.total for t in transfers))))
+
+    try: transfers = await uploader.upload(path, report)
+    except OSError as e: raise StepFailed(f"video file not readable ({e})") from e
+    for t in transfers:
+        if t.error: publish(_log(job, "ERROR", f"Upload to {t.dest} failed: {t.error}", index))
+        else:
+            resumed = f", resumed after {t.resumed / 1e6:.1f} MB" if t.resumed else ""
+            publish(_log(job, "INFO", f"Uploaded to {t.dest}: {t.total / 1e6:.1f} MB in {t.elapsed:.1f}s "
+                                      f"({t.rate() / 1e6:.1f} MB/s{resumed}) -> {t.url}", index))
+    failed = [t.dest for t in transfers if t.error]
+    if failed: raise StepFailed(f"upload failed for {', '.join(failed)}")
+
+
+async def _cleanup_cancelled(backend, job_id):
+    # Runs after the in-flight work was interrupted; bounded by CLEANUP_DEADLINE
+    if backend is None or job_id is None: return
+    try: await asyncio.wait_for(backend.cancel(job_id, timeout=CLEANUP_DEADLINE), CLEANUP_DEADLINE)
+    except (BackendError, OSError, asyncio.TimeoutError): pass
+
+
+def story_batcher(backend, max_batch=16, max_wait=0.05):
+    # Micro-batches Story Creation across the jobs running on one event loop (batching.py)
+    from batching import MicroBatcher
+    return MicroBatcher(lambda items, timed: backend.run_stage_batch("story_creation", items,
+                                                                     upstream=STEPS[0]["upstream"], on_round_trip=timed),
+                        max_batch, max_wait)
+
+
+async def run_job(job, prompt, bus, time_scale=1.0, fail_step=None, stop=None, backend=None, batcher=None,
+                  uploader=None, story_slot=None, slot=None):
+    """Run one prompt through every step, publishing typed events on `bus`.
+    `stop` is a cancellation.CancelToken (a plain threading.Event is polled instead).
+    `batcher` (see story_batcher) routes Story Creation through a shared micro-batch.
+    `uploader` (uploads.Uploader) uploads the video File Download returned as "file".
+    `story_slot` / `slot` (asyncio.Semaphore) are held up to the end of Story Creation / for the steps after it,
+    so jobs waiting for a slot can still share a Story Creation batch.
+    Returns "done", "failed" or "cancelled"."""
+    publish = bus.publish
+    unbind = stop.bind() if hasattr(stop, "bind") else None
+    job_id = video = held = None; i = None; t0 = time.monotonic()
+    try:
+        if story_slot is not None: await story_slot.acquire(); held = story_slot
+        publish(_log(job, "INFO", "Initializing ChatGPT API connection"))
+        if backend is not None: job_id = await backend.create_job(prompt)
+        publish(_log(job, "INFO", "Sending story generation prompt"))
+        for i, step in enumerate(STEPS):
+            publish(_started(job, i))
+            publish(_log(job, "INFO", f"Step {i + 1}/{len(STEPS)}: {step['desc']}", i))
+            t0 = time.monotonic()
+            try:
+                if fail_step == step["key"]: raise StepFailed("Simulated failure")
+                if backend is not None and uploader is not None and video and step["key"] == "upload" \
+                        and os.path.isfile(video):
+                    await _upload_step(job, i, publish, uploader, video)
+                elif backend is not None:
+                    if batcher is not None and step["key"] == "story_creation":
+                        request = batcher.submit((job_id, prompt))
+                    else:
+                        request = backend.run_stage(job_id, step["key"], upstream=step["upstream"])
+                    result = await _backend_step(job, i, publish, request)
+                    if isinstance(result, dict) and result.get("file"): video = result["file"]
+                else: await _simulate_step(job, i, publish, time_scale, stop)
+            except StepFailed as e:
+                publish(_finished(job, i, StepFinished.FAILED, time.monotonic() - t0, str(e)))
+                publish(_log(job, "ERROR", f"{step['title']}: {e}", i))
+                return StepFinished.FAILED
+            publish(_finished(job, i, StepFinished.DONE, time.monotonic() - t0))
+            publish(_log(job, "SUCCESS", f"{step['title']} completed.", i))
+            if slot is not None and step["key"] == "story_creation":
+                i = None                                # no step runs while we wait for a slot
+                if held is not None: held.release(); held = None
+                await slot.acquire(); held = slot
+        publish(_log(job, "SUCCESS", "Workflow completed."))
+        return StepFinished.DONE
+    except (Stopped, asyncio.CancelledError):
+        if not (stop is not None and stop.is_set()): raise   # cancelled by someone else (e.g. loop shutdown)
+        await _cleanup_cancelled(backend, job_id)
+        if i is not None:
+            publish(_finished(job, i, StepFinished.CANCELLED, time.monotonic() - t0, "Stopped by user"))
+        publish(_log(job, "INFO", "Pipeline stopped by user.", i))
+        return StepFinished.CANCELLED
+    except (BackendError, OSError) as e:
+        publish(_log(job, "ERROR", f"Could not create backend job: {e}"))
+        return StepFinished.FAILED
+    finally:
+        if held is not None: held.release()
+        if unbind is not None:
+            unbind()
+            if stop.stop_latency is not None:
+                publish(_log(job, "INFO", f"Stop completed in {stop.stop_latency * 1000:.0f} ms."))
+
+
+def run_job_in_thread(job, prompt, bus, **kw):
+    # GUI helper: run one job on a daemon thread with its own event loop
+    t = threading.Thread(target=lambda: asyncio.run(run_job(job, prompt, bus, **kw)), daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,82 @@
+# process_worker.py — runs one pipeline job in its own process (used by dearpy_gui.py)
+# - Events go to the GUI through a shared-memory ring (shm_ring.py), not pickled queues
+# - stdin  <- control: a "stop" line hard-cancels the job
+# - --replay / --record (default: STORYMORPH_REPLAY / STORYMORPH_RECORD) replay an event stream instead
+#   of running the pipeline, or record the run (event_replay.py)
+#
+#   python process_worker.py --shm <name> --capacity 4096 [--fail-step KEY]
+
+import argparse, asyncio, os, sys, threading, time
+
+import pipeline
+import ratelimit
+from backend import default_client
+from cancellation import CancelToken
+from event_replay import Recorder, open_source, parse_speed, recording_path, replay
+from events import EventBus
+from shm_ring import ShmRing
+from uploads import default_uploader
+
+
+def _watch_stdin(token):
+    for line in sys.stdin:
+        if line.strip() == "stop": token.cancel(); return
+    token.cancel()   # parent went away
+
+
+STATS_INTERVAL = 0.5
+WRITE_TIMEOUT = 5.0     # s the ring may stay full before the GUI counts as gone (hung or closed)
+
+def _forward(sub, ring, done, token):
+    next_stats = 0.0; gone = False
+    while True:
+        sub.wait(0.05)
+        evs = sub.drain(256)
+        for ev in evs:
+            if gone or ring.write(ev, WRITE_TIMEOUT): continue
+            gone = True; token.cancel()     # nobody reads the ring: stop the job, keep draining the bus
+            print(f"event ring full for {WRITE_TIMEOUT:g} s: the GUI is not reading, stopping", file=sys.stderr)
+        if not gone and time.monotonic() >= next_stats:   # limiter state lives in this process
+            ring.write_stats({"rate_limits": ratelimit.snapshot_all()})
+            next_stats = time.monotonic() + STATS_INTERVAL
+        if done.is_set() and not len(sub): return
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Pipeline worker process (shared-memory event ring).")
+    ap.add_argument("--shm", required=True)
+    ap.add_argument("--capacity", type=int, required=True)
+    ap.add_argument("--job", type=int, default=0)
+    ap.add_argument("--prompt", default="")
+    ap.add_argument("--fail-step", choices=pipeline.STEP_KEYS)
+    ap.add_argument("--time-scale", type=float, default=1.0)
+    ap.add_argument("--replay", default=os.environ.get("STORYMORPH_REPLAY"),
+                    help="replay this recording (or 'synthetic[:LOGS_PER_MIN[:SECONDS]]') instead of running the pipeline")
+    ap.add_argument("--speed", default=os.environ.get("STORYMORPH_REPLAY_SPEED", "1"), help="replay speed: 1, N or max")
+    ap.add_argument("--record", default=os.environ.get("STORYMORPH_RECORD"), help="record the run's events in this directory")
+    args = ap.parse_args(argv)
+
+    ring = ShmRing.attach(args.shm, args.capacity)
+    bus = EventBus(); sub = bus.subscribe(maxsize=1024)
+    token = CancelToken(); done = threading.Event()
+    threading.Thread(target=_watch_stdin, args=(token,), daemon=True).start()
+    fwd = threading.Thread(target=_forward, args=(sub, ring, done, token), daemon=True)
+    fwd.start()
+    recorder = Recorder(bus, recording_path(args.record, "dearpygui")) if args.record else None
+    try:
+        if args.replay:
+            replay(open_source(args.replay), bus.publish, parse_speed(args.speed), token)
+            status = "cancelled" if token.is_set() else "done"
+        else:
+            status = asyncio.run(pipeline.run_job(args.job, args.prompt, bus, time_scale=args.time_scale,
+                                                  fail_step=args.fail_step, stop=token, backend=default_client(),
+                                                  uploader=default_uploader()))
+    finally:
+        done.set(); fwd.join(WRITE_TIMEOUT + 1)
+        if recorder: recorder.close()
+        ring.close()
+    return 0 if status == "done" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+# ratelimit.py — process-wide token buckets per upstream + adaptive retry
+# - One TokenBucket per upstream (ChatGPT, image, TTS, ... services), shared by every job/thread
+# - Reservation-based acquire: callers queue FIFO without busy-waiting
+# - AIMD adaptation: each 429 halves the rate (and honours Retry-After), successes recover it slowly
+# - call_with_retry(): jittered exponential backoff for 429 / 503 / connection errors
+#
+# Limits: STORYMORPH_RATE_LIMITS="chatgpt=1:3,images=2:4,upload=5:10,upload:tiktok=2:4"  (requests/second : burst)
+
+import asyncio, os, random, threading, time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+DEFAULT_LIMITS = {           # upstream -> (requests/second, burst)
+    "backend":   (10.0, 20),
+    "chatgpt":   (1.0, 3),
+    "images":    (2.0, 4),
+    "tts":       (2.0, 4),
+    "captions":  (4.0, 8),
+    "upload":    (5.0, 10),  # per destination: upload:<dest> falls back to this
+}
+RETRY_STATUSES = (429, 503)
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+
+
+def _env_limits():
+    limits = dict(DEFAULT_LIMITS)
+    for part in filter(None, os.environ.get("STORYMORPH_RATE_LIMITS", "").split(",")):
+        name, _, spec = part.partition("=")
+        rate, _, burst = spec.partition(":")
+        limits[name.strip()] = (float(rate), int(burst or max(1, float(rate))))
+    return limits
+
+
+class TokenBucket:
+    def __init__(self, name, rate, burst, min_rate=None, recover_step=None):
+        self.name = name
+        self.max_rate = self.rate = float(rate)
+        self.min_rate = min_rate or self.max_rate / 8
+        self.recover_step = recover_step or self.max_rate / 20
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.queue_depth = 0          # callers currently waiting for a token
+        self.throttled_s = 0.0        # total time callers spent waiting
+        self.throttles = 0            # 429s observed
+        self._last_cut = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take one token (possibly going negative) and return how long to wait for it."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait <= 0: return 0.0
+        with self._lock: self.queue_depth += 1
+        t0 = time.monotonic()
+        try: await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            # give the reserved token back, or the next caller inherits the debt (refill already covers the time waited)
+            with self._lock: self.tokens = min(self.burst, self.tokens + 1)
+            raise
+        finally:
+            with self._lock: self.queue_depth -= 1; self.throttled_s += min(wait, time.monotonic() - t0)
+        return wait
+
+    def on_success(self):
+        with self._lock:
+            if self.rate < self.max_rate: self.rate = min(self.max_rate, self.rate + self.recover_step)
+
+    def on_throttle(self, retry_after=None):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.throttles += 1
+            # One multiplicative decrease per token interval: a burst of 429s from requests
+            # that were already in flight counts as a single congestion signal
+            if now - self._last_cut >= 1.0 / self.rate:
+                self.rate = max(self.min_rate, self.rate / 2); self._last_cut = now
+            if retry_after:   # nobody gets a token before the server said so
+                self.tokens = min(self.tokens, -retry_after * self.rate)
+
+    def snapshot(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return {"name": self.name, "rate": round(self.rate, 3), "max_rate": self.max_rate,
+                    "tokens": round(self.tokens, 2), "queue_depth": self.queue_depth,
+                    "throttled_s": round(self.throttled_s, 2), "throttles": self.throttles}
+
+
+# ---------------- Registry (process-wide) ----------------
+_limiters = {}
+_registry_lock = threading.Lock()
+
+def get_limiter(name):
+    with _registry_lock:
+        b = _limiters.get(name)
+        if b is None:
+            limits = _env_limits()   # "upload:tiktok" -> its own entry, else "upload", else "backend"
+            rate, burst = limits.get(name) or limits.get(name.partition(":")[0]) or limits["backend"]
+            b = _limiters[name] = TokenBucket(name, rate, burst)
+        return b
+
+def snapshot_all():
+    with _registry_lock: buckets = list(_limiters.values())
+    return [b.snapshot() for b in buckets]
+
+
+# ---------------- Retry ----------------
+def parse_retry_after(value):
+    if not value: return None
+    try: return max(0.0, float(value))
+    except ValueError: pass
+    try: return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError): return None
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    # "Full jitter": uniform in [0, min(cap, base * 2^attempt)]
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+async def call_with_retry(upstream, fn, max_attempts=MAX_ATTEMPTS):
+    """Await fn() under the upstream's token bucket, retrying throttles and transient failures."""
+    bucket = get_limiter(upstream)
+    for attempt in range(max_attempts):
+        await bucket.acquire()
+        try:
+            result = await fn()
+        except (ConnectionError, asyncio.TimeoutError):
+            if attempt == max_attempts - 1: raise
+            await asyncio.sleep(backoff_delay(attempt))
+            continue
+        except Exception as e:   # backend.BackendError (duck-typed: .status / .headers)
+            status = getattr(e, "status", None)
+            if status not in RETRY_STATUSES or attempt == max_attempts - 1: raise
+            retry_after = parse_retry_after(getattr(e, "headers", {}).get("retry-after"))
+            if status == 429:
+                bucket.on_throttle(retry_after)   # Retry-After is enforced by the bucket for every caller
+                await asyncio.sleep(backoff_delay(attempt))
+            else:
+                await asyncio.sleep(max(retry_after or 0.0, backoff_delay(attempt)))
+            continue
+        bucket.on_success()
+        return result
@@ -0,0 +1,140 @@
+# shm_ring.py — single-producer / single-consumer event ring in shared memory
+# - Fixed-size packed records (RECORD_SIZE bytes) instead of pickled queue messages
+# - Header: write_seq / read_seq counters
+# - Producer never overwrites unread records (it waits, backing off up to FULL_BACKOFF, until its
+#   timeout; the event bus in front of it absorbs bursts with its own drop-oldest / never-drop policy)
+# - The reader polls (the Dear PyGui render loop, once per frame): no syscalls on either side
+# - TransferProgress packs its throughput into `value`, done into `status` and "sent total dest" into the text
+# - A small seqlock-protected JSON "stats" block carries worker-side state (e.g. rate limiters)
+
+import json, struct, time
+from multiprocessing import shared_memory
+
+import pipeline
+from events import StepStarted, StepProgress, StepFinished, LogRecord, TransferProgress
+
+HEADER = struct.Struct("<QQ")           # write_seq, read_seq
+STATS = struct.Struct("<QI")            # version (odd while writing), length
+STATS_OFFSET = 64
+STATS_MAX = 2048 - STATS.size
+HEADER_SIZE = STATS_OFFSET + STATS.size + STATS_MAX
+RECORD_SIZE = 256
+REC = struct.Struct("<QdiffbBBBH")      # seq, ts, job, value, elapsed, index, kind, status, level, msg_len
+MSG_MAX = RECORD_SIZE - REC.size
+FULL_BACKOFF = 0.05                     # s; longest sleep between checks while the ring is full
+
+KINDS = {StepStarted: 1, StepProgress: 2, StepFinished: 3, LogRecord: 4, TransferProgress: 5}
+KIND_TYPES = {v: k for k, v in KINDS.items()}
+STATUSES = [StepFinished.DONE, StepFinished.FAILED, StepFinished.CANCELLED]
+LEVELS = ["INFO", "SUCCESS", "ERROR", "WARNING", "DEBUG"]
+
+
+def _encode_msg(text):
+    return (text or "").encode("utf-8")[:MSG_MAX]   # a split UTF-8 tail is dropped on decode
+
+
+class ShmRing:
+    def __init__(self, shm, capacity, owner):
+        self.shm = shm; self.buf = shm.buf
+        self.capacity = capacity; self.owner = owner
+        self.name = shm.name
+
+    @classmethod
+    def create(cls, capacity=4096):
+        shm = shared_memory.SharedMemory(create=True, size=HEADER_SIZE + capacity * RECORD_SIZE)
+        HEADER.pack_into(shm.buf, 0, 0, 0)
+        STATS.pack_into(shm.buf, STATS_OFFSET, 0, 0)
+        return cls(shm, capacity, owner=True)
+
+    @classmethod
+    def attach(cls, name, capacity):
+        shm = shared_memory.SharedMemory(name=name)
+        try:   # the creating process owns the segment; don't let this process' tracker unlink it
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return cls(shm, capacity, owner=False)
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            try: self.shm.unlink()
+            except FileNotFoundError: pass
+
+    # ---------------- header ----------------
+    def _header(self): return HEADER.unpack_from(self.buf, 0)
+    def _set_write(self, seq): struct.pack_into("<Q", self.buf, 0, seq)
+    def _set_read(self, seq): struct.pack_into("<Q", self.buf, 8, seq)
+
+    def __len__(self):
+        w, r = self._header(); return w - r
+
+    # ---------------- producer ----------------
+    def write(self, ev, timeout=None):
+        """False if the ring stayed full for `timeout` seconds (the record is not written)."""
+        w, r = self._header()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pause = 0.001
+        while w - r >= self.capacity:          # full: wait for the reader, never overwrite
+            if deadline is not None and time.monotonic() >= deadline: return False
+            time.sleep(pause); pause = min(FULL_BACKOFF, pause * 2); w, r = self._header()
+        status = level = 0; value = elapsed = 0.0; msg = b""
+        if isinstance(ev, StepProgress): value = ev.value
+        elif isinstance(ev, StepFinished):
+            status = STATUSES.index(ev.status); elapsed = ev.elapsed or 0.0; msg = _encode_msg(ev.reason)
+        elif isinstance(ev, LogRecord):
+            level = LEVELS.index(ev.level) if ev.level in LEVELS else 0; msg = _encode_msg(ev.msg)
+        elif isinstance(ev, TransferProgress):
+            value = ev.rate; status = int(ev.done); msg = _encode_msg(f"{ev.sent} {ev.total} {ev.dest}")
+        off = HEADER_SIZE + (w % self.capacity) * RECORD_SIZE
+        REC.pack_into(self.buf, off, w, ev.ts, ev.job or 0, value, elapsed,
+                      -1 if ev.index is None else ev.index, KINDS[type(ev)], status, level, len(msg))
+        self.buf[off + REC.size: off + REC.size + len(msg)] = msg
+        self._set_write(w + 1)                 # publish after the record is complete
+        return True
+
+    def write_stats(self, obj):
+        data = json.dumps(obj, separators=(",", ":")).encode()[:STATS_MAX]
+        version = STATS.unpack_from(self.buf, STATS_OFFSET)[0]
+        struct.pack_into("<Q", self.buf, STATS_OFFSET, version + 1)          # odd: write in progress
+        base = STATS_OFFSET + STATS.size
+        self.buf[base: base + len(data)] = data
+        STATS.pack_into(self.buf, STATS_OFFSET, version + 2, len(data))
+
+    # ---------------- consumer ----------------
+    def read(self, max_items=256):
+        w, r = self._header()
+        out = []
+        end = min(w, r + max_items)
+        for seq in range(r, end):
+            off = HEADER_SIZE + (seq % self.capacity) * RECORD_SIZE
+            rseq, ts, job, value, elapsed, index, kind, status, level, n = REC.unpack_from(self.buf, off)
+            if rseq != seq: break                 # not fully written yet
+            msg = bytes(self.buf[off + REC.size: off + REC.size + n]).decode("utf-8", "ignore")
+            idx = None if index < 0 else index
+            step = pipeline.STEP_KEYS[idx] if idx is not None else None
+            cls = KIND_TYPES[kind]
+            if cls is StepStarted: ev = StepStarted(job, step, idx, ts=ts)
+            elif cls is StepProgress: ev = StepProgress(job, step, idx, value, ts=ts)
+            elif cls is StepFinished: ev = StepFinished(job, step, idx, STATUSES[status], elapsed, msg or None, ts=ts)
+            elif cls is TransferProgress:
+                sent, total, dest = msg.split(" ", 2)
+                ev = TransferProgress(job, step, idx, dest, int(sent), int(total), value, bool(status), ts=ts)
+            else: ev = LogRecord(job, step, idx, LEVELS[level], msg, ts=ts)
+            out.append(ev); r = seq + 1
+        if out: self._set_read(r)
+        return out
+
+    def read_stats(self, retries=3):
+        for _ in range(retries):
+            v1, n = STATS.unpack_from(self.buf, STATS_OFFSET)
+            if v1 == 0: return None
+            if v1 % 2: continue
+            base = STATS_OFFSET + STATS.size
+            data = bytes(self.buf[base: base + n])
+            if STATS.unpack_from(self.buf, STATS_OFFSET)[0] == v1:
+                try: return json.loads(data)
+                except ValueError: return None
+        return None
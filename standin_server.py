@@ -0,0 +1,290 @@
+# standin_server.py — local stand-in for the FastAPI video backend (stdlib only)
+# - Same endpoints as backend.BackendClient, with simulated stage durations
+# - Stages poll their job's cancel flag so POST /jobs/{id}/cancel takes effect mid-stage
+# - POST /stages/{stage}/batch runs one stage for several jobs; cost = one full request plus
+#   BATCH_ITEM_COST of it per extra item (models the per-request overhead batching saves)
+# - --inject-429 P answers a fraction P of stage requests with 429 + Retry-After (rate limiter testing)
+# - --output-dir D writes sample artifacts to D/<job_id>/: scene images after Image Generation and a video
+#   after File Download (artifact gallery testing); File Download then returns the video's path as "file".
+#   The video is a short ffmpeg test clip, or --video-mb MiB of filler bytes (always without ffmpeg)
+# - Resumable multipart uploads for the Upload stage (uploads.py): parts are stored below --upload-dir and
+#   joined on completion; --upload-rate caps each connection's bandwidth (MB/s, optionally per destination) and
+#   --upload-fail P drops a fraction P of part requests half way (retry / resume testing)
+#
+#   python standin_server.py --port 8765 --time-scale 0.5 --inject-429 0.2
+#   python standin_server.py --output-dir out --upload-rate "youtube=40,tiktok=15,*=25" --upload-fail 0.1
+
+import argparse, json, os, random, re, shutil, subprocess, tempfile, threading, time, uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pipeline
+from thumbnails import FFMPEG, write_png
+
+DURATIONS = {s["key"]: s["duration"] for s in pipeline.STEPS}
+BATCH_ITEM_COST = 0.1
+SCENES = 4
+SCENE_SIZE = (640, 360)
+UPLOAD_PART_SIZE = 8 << 20
+MIN_PART_SIZE = 64 << 10
+UPLOAD_BLOCK = 256 << 10
+
+
+def write_artifacts(output_dir, job_id, stage, video_mb=None):
+    """Returns the video's path after File Download, else None."""
+    out = os.path.join(output_dir, job_id)
+    os.makedirs(out, exist_ok=True)
+    if stage == "image_generation":
+        w, h = SCENE_SIZE
+        for n in range(SCENES):
+            rnd = random.Random(f"{job_id}/{n}")
+            c0, c1 = [rnd.randrange(40, 256) for _ in range(3)], [rnd.randrange(0, 200) for _ in range(3)]
+            rows = []
+            for y in range(h):
+                t = y / (h - 1)
+                px = bytes(int(a + (b - a) * t) for a, b in zip(c0, c1)) + b"\xff"
+                rows.append(px * w)
+            write_png(os.path.join(out, f"scene_{n + 1:02d}.png"), w, h, b"".join(rows))
+    elif stage == "file_download":
+        video = os.path.join(out, "video.mp4")
+        if FFMPEG and not video_mb:
+            subprocess.run([FFMPEG, "-v", "error", "-nostdin", "-y", "-f", "lavfi", "-i",
+                            f"testsrc=duration=3:size={SCENE_SIZE[0]}x{SCENE_SIZE[1]}:rate=24",
+                            "-pix_fmt", "yuv420p", video], timeout=60)
+        else:   # not a playable video: stands in for a large file in upload tests
+            with open(video, "wb") as f:
+                for _ in range(int(video_mb or 32)): f.write(os.urandom(1 << 20))
+        return video
+    return None
+
+
+def parse_rates(text):
+    # "25" or "youtube=40,tiktok=15,*=25" (MB/s) -> {destination or "*": bytes/s}
+    rates = {}
+    for part in filter(None, (text or "").split(",")):
+        name, _, mbps = part.rpartition("=")
+        rates[name.strip() or "*"] = float(mbps) * 1e6
+    return rates
+
+
+class StandinState:
+    def __init__(self, time_scale=1.0, inject_429=0.0, retry_after=1.0):
+        self.time_scale = time_scale
+        self.inject_429 = inject_429
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.jobs = {}      # job_id -> {"prompt", "cancelled", "stages"}
+        self.throttled = 0  # 429s sent
+        self.uploads = {}   # upload_id -> {"destination", "filename", "size", "part_size", "parts", "url"}
+        self.upload_rates = {}
+        self.upload_fail = 0.0
+        self.dropped_parts = 0
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "StandinBackend/1.0"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose: super().log_message(fmt, *args)
+
+    @property
+    def state(self): return self.server.state
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items(): self.send_header(k, v)
+        try:
+            self.end_headers(); self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError): pass   # client aborted (e.g. cancelled request)
+
+    def _json_body(self):
+        n = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(n) or b"{}") if n else {}
+
+    def do_GET(self):
+        if self.path == "/healthz": return self._send(200, {"ok": True})
+        m = re.fullmatch(r"/uploads/(\w+)", self.path)
+        if m:
+            up = self.state.uploads.get(m.group(1))
+            if up is None: return self._send(404, {"detail": "unknown upload"})
+            return self._send(200, {"upload_id": m.group(1), "destination": up["destination"], "size": up["size"],
+                                    "part_size": up["part_size"], "received": sorted(up["parts"])})
+        self._send(404, {"detail": "not found"})
+
+    def do_PUT(self):
+        m = re.fullmatch(r"/uploads/(\w+)/parts/(\d+)", self.path)
+        if m: return self._put_part(m.group(1), int(m.group(2)))
+        self.close_connection = True
+        self._send(404, {"detail": "not found"})
+
+    def do_POST(self):
+        payload = self._json_body()
+        if self.path == "/uploads":
+            return self._create_upload(payload)
+        m = re.fullmatch(r"/uploads/(\w+)/complete", self.path)
+        if m:
+            return self._complete_upload(m.group(1), payload)
+        if self.path == "/jobs":
+            job_id = uuid.uuid4().hex[:12]
+            with self.state.lock:
+                self.state.jobs[job_id] = {"prompt": payload.get("prompt", ""), "cancelled": False, "stages": []}
+            return self._send(200, {"job_id": job_id})
+        m = re.fullmatch(r"/jobs/(\w+)/cancel", self.path)
+        if m:
+            with self.state.lock:
+                job = self.state.jobs.get(m.group(1))
+                if job: job["cancelled"] = True
+            return self._send(200 if job else 404, {"cancelled": bool(job)})
+        m = re.fullmatch(r"/jobs/(\w+)/stages/(\w+)", self.path)
+        if m:
+            return self._run_stage(m.group(1), m.group(2), payload)
+        m = re.fullmatch(r"/stages/(\w+)/batch", self.path)
+        if m:
+            return self._run_batch(m.group(1), payload.get("jobs", []))
+        self._send(404, {"detail": "not found"})
+
+    def _run_stage(self, job_id, stage, payload):
+        job = self.state.jobs.get(job_id)
+        if job is None or stage not in DURATIONS: return self._send(404, {"detail": "unknown job or stage"})
+        if self.state.inject_429 and random.random() < self.state.inject_429:
+            with self.state.lock: self.state.throttled += 1
+            return self._send(429, {"detail": "rate limited"}, {"Retry-After": f"{self.state.retry_after:g}"})
+        end = time.monotonic() + DURATIONS[stage] * self.state.time_scale
+        while time.monotonic() < end:
+            if job["cancelled"]: return self._send(409, {"detail": "job cancelled"})
+            time.sleep(0.01)
+        job["stages"].append(stage)
+        res = {"job_id": job_id, "stage": stage, "output": f"{stage} output for {job_id}"}
+        if self.server.output_dir:
+            video = write_artifacts(self.server.output_dir, job_id, stage, self.server.video_mb)
+            if video: res["file"] = video
+        self._send(200, res)
+
+    def _run_batch(self, stage, items):
+        if stage not in DURATIONS: return self._send(404, {"detail": "unknown stage"})
+        if self.state.inject_429 and random.random() < self.state.inject_429:
+            with self.state.lock: self.state.throttled += 1
+            return self._send(429, {"detail": "rate limited"}, {"Retry-After": f"{self.state.retry_after:g}"})
+        cost = 1 + BATCH_ITEM_COST * max(0, len(items) - 1)
+        time.sleep(DURATIONS[stage] * self.state.time_scale * cost)
+        with self.state.lock: self.state.batches = getattr(self.state, "batches", 0) + 1
+        results = []
+        for it in items:
+            job = self.state.jobs.get(it.get("job_id"))
+            if job is None: results.append({"job_id": it.get("job_id"), "status": 404, "error": "unknown job"})
+            elif job["cancelled"]: results.append({"job_id": it["job_id"], "status": 409, "error": "job cancelled"})
+            else:
+                job["stages"].append(stage)
+                res = {"job_id": it["job_id"], "stage": stage, "output": f"{stage} output for {it['job_id']}"}
+                if self.server.output_dir:
+                    video = write_artifacts(self.server.output_dir, it["job_id"], stage, self.server.video_mb)
+                    if video: res["file"] = video
+                results.append(res)
+        self._send(200, {"results": results})
+
+    # ---------------- uploads ----------------
+    def _create_upload(self, payload):
+        size = int(payload.get("size") or 0)
+        part_size = max(MIN_PART_SIZE, int(payload.get("part_size") or UPLOAD_PART_SIZE))
+        upload_id = uuid.uuid4().hex[:16]
+        with self.state.lock:
+            self.state.uploads[upload_id] = {"destination": str(payload.get("destination") or "default"),
+                                             "filename": os.path.basename(payload.get("filename") or "video.mp4"),
+                                             "size": size, "part_size": part_size, "parts": {}, "url": None}
+        self._send(200, {"upload_id": upload_id, "part_size": part_size})
+
+    def _put_part(self, upload_id, n):
+        up = self.state.uploads.get(upload_id)
+        length = int(self.headers.get("Content-Length") or 0)
+        if up is None:
+            self.close_connection = True; return self._send(404, {"detail": "unknown upload"})
+        expected = min(up["part_size"], up["size"] - (n - 1) * up["part_size"])
+        if n < 1 or expected <= 0 or length != expected:
+            self.close_connection = True
+            return self._send(400, {"detail": f"part {n} must be {max(0, expected)} bytes, got {length}"})
+        part_dir = os.path.join(self.server.upload_dir, upload_id)
+        os.makedirs(part_dir, exist_ok=True)
+        path = os.path.join(part_dir, f"part-{n:05d}")
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        drop_at = length // 2 if self.state.upload_fail and random.random() < self.state.upload_fail else None
+        rates = self.state.upload_rates
+        bps = rates.get(up["destination"], rates.get("*"))
+        t0, got = time.monotonic(), 0
+        try:
+            with open(tmp, "wb") as f:
+                while got < length:
+                    if drop_at is not None and got >= drop_at:
+                        with self.state.lock: self.state.dropped_parts += 1
+                        self.close_connection = True
+                        return self._send(503, {"detail": "connection dropped (injected)"})
+                    block = self.rfile.read(min(UPLOAD_BLOCK, length - got))
+                    if not block: self.close_connection = True; return     # client went away
+                    f.write(block); got += len(block)
+                    if bps and (delay := t0 + got / bps - time.monotonic()) > 0: time.sleep(delay)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp): os.remove(tmp)
+        with self.state.lock: up["parts"][n] = length
+        self._send(200, {"part": n, "size": length})
+
+    def _complete_upload(self, upload_id, payload):
+        up = self.state.uploads.get(upload_id)
+        if up is None: return self._send(404, {"detail": "unknown upload"})
+        if up["url"]: return self._send(200, {"url": up["url"]})
+        parts = -(-up["size"] // up["part_size"])
+        missing = [n for n in range(1, parts + 1) if n not in up["parts"]]
+        if missing or int(payload.get("parts") or parts) != parts:
+            return self._send(409, {"detail": "incomplete upload", "missing": missing})
+        part_dir = os.path.join(self.server.upload_dir, upload_id)
+        out_dir = os.path.join(self.server.upload_dir, up["destination"])
+        os.makedirs(out_dir, exist_ok=True)
+        out = os.path.join(out_dir, f"{upload_id}-{up['filename']}")
+        with open(out, "wb") as fo:
+            for n in range(1, parts + 1):
+                with open(os.path.join(part_dir, f"part-{n:05d}"), "rb") as fi: shutil.copyfileobj(fi, fo, 1 << 20)
+        shutil.rmtree(part_dir, ignore_errors=True)
+        up["url"] = f"standin://{up['destination']}/{upload_id}/{up['filename']}"
+        self._send(200, {"url": up["url"], "size": os.path.getsize(out)})
+
+
+def make_server(host="127.0.0.1", port=8765, time_scale=1.0, verbose=False, inject_429=0.0, retry_after=1.0,
+                output_dir=None, video_mb=None, upload_dir=None, upload_rates=None, upload_fail=0.0):
+    srv = ThreadingHTTPServer((host, port), Handler)
+    srv.daemon_threads = True
+    srv.state = StandinState(time_scale, inject_429, retry_after); srv.verbose = verbose
+    srv.state.upload_rates, srv.state.upload_fail = upload_rates or {}, upload_fail
+    srv.output_dir, srv.video_mb = output_dir, video_mb
+    srv.upload_dir = upload_dir or tempfile.mkdtemp(prefix="standin-uploads-")
+    return srv
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Local stand-in for the video backend.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--time-scale", type=float, default=1.0, help="multiplier for simulated stage durations")
+    ap.add_argument("--inject-429", type=float, default=0.0, metavar="P",
+                    help="fraction of stage requests answered with 429 Too Many Requests")
+    ap.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with injected 429s")
+    ap.add_argument("--output-dir", metavar="DIR", help="write sample artifacts (images, video) per job below DIR")
+    ap.add_argument("--video-mb", type=int, metavar="MiB",
+                    help="write the File Download video as this many MiB of filler bytes (default: ffmpeg clip, else 32)")
+    ap.add_argument("--upload-dir", metavar="DIR", help="where uploaded parts / files go (default: a temp directory)")
+    ap.add_argument("--upload-rate", metavar="MBPS",
+                    help="per-connection upload bandwidth in MB/s: N, or per destination 'youtube=40,tiktok=15,*=25'")
+    ap.add_argument("--upload-fail", type=float, default=0.0, metavar="P",
+                    help="fraction of upload parts whose connection is dropped half way")
+    ap.add_argument("-v", "--verbose", action="store_true")
+    args = ap.parse_args(argv)
+    srv = make_server(args.host, args.port, args.time_scale, args.verbose, args.inject_429, args.retry_after,
+                      args.output_dir, args.video_mb, args.upload_dir, parse_rates(args.upload_rate), args.upload_fail)
+    print(f"stand-in backend on http://{args.host}:{srv.server_port} (uploads in {srv.upload_dir})")
+    try: srv.serve_forever()
+    except KeyboardInterrupt: pass
+
+
+if __name__ == "__main__":
+    main()
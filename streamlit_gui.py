@@ -5,20 +5,44 @@
 # - Step cards centered (no bullets), green on completion
 # - Logs as cards: level pill + centered timestamp (no bullets)
 # - Even padding in group boxes; sleek darker pastel background
+# - Fast first paint: plain background + default buttons on a session's first run, then the
+#   gradient and styled buttons; streamlit_extras / backend / job queue load on first use
+# - Artifacts gallery: thumbnails of generated images / videos, made in the background for the
+#   page being shown only (thumbnails.py)
+# - Load testing: STORYMORPH_REPLAY replays a recorded / synthetic event stream instead of running the
+#   pipeline; STORYMORPH_RECORD records each run (event_replay.py, gui_bench.py)
+# - Upload step card: per-destination progress and throughput of the video upload (uploads.py)
 
+import boot   # first: the startup report measures from here
+
+import os
 import time
+RUN_T0 = time.perf_counter()   # this script run (Streamlit re-executes the script on every rerun)
 from datetime import datetime, timedelta
 from html import escape
-import streamlit as st
-from streamlit.components.v1 import html as st_html
-from streamlit_extras.stylable_container import stylable_container
+with boot.phase("import streamlit"):
+    import streamlit as st
+    from streamlit.components.v1 import html as st_html
+
+with boot.phase("import pipeline modules"):
+    import pipeline
+    from cancellation import CancelToken, CLEANUP_DEADLINE
+    from eta import DurationModel
+    from event_replay import recorder_from_env, replay_in_thread, source_from_env
+    from log_index import LogIndex
+    from log_sink import default_sink
+    from live_clock import live_clock, live_progress, refresh_interval, ProgressSync, HEARTBEAT
+    from ratelimit import snapshot_all as rate_limit_snapshot
+    from thumbnails import ThumbnailCache, list_artifacts, OUTPUT_DIR
+    from events import EventBus, StepStarted, StepProgress, StepFinished, LogRecord, TransferProgress
 
 st.set_page_config(page_title="Python Workflow Monitor", layout="wide")
+first_paint = "booted" not in st.session_state
 
 # =========================
-# CSS
+# Background (plain on the first paint; the gradient is heavy for the browser to composite)
 # =========================
-st.markdown("""
+BACKGROUND_CSS = """
 <style>
 /* ===== Sleek, darker background with modern aesthetic ===== */
 .stApp {
@@ -62,7 +86,16 @@ st.markdown("""
 
   background-attachment: fixed;
 }
+</style>
+"""
+st.markdown("<style>.stApp { background: #0b1220; }</style>" if first_paint else BACKGROUND_CSS,
+            unsafe_allow_html=True)
 
+# =========================
+# CSS
+# =========================
+st.markdown("""
+<style>
 /* ===== Global variables =====
    - Set --page-frame-* to 0 to remove Streamlit's inner frame
    - Use --shell-* to control the faint wrapper that sometimes 'frames' everything */
@@ -242,6 +275,10 @@ div[data-testid="stVerticalBlock"]:has(#steps-anchor)::after {
 .step-card  { text-align:center; padding: 17px; transition: background 0.4s ease, border-color 0.4s ease !important; }
 .step-title { font-size: 20px; font-weight: 620; letter-spacing: .2px; display:block; margin-bottom:6px; }
 .step-desc  { font-size: 17px; opacity:.53; }
+.up-row     { display:grid; grid-template-columns: auto 1fr; gap:2px 8px; margin-top:10px; font-size:13px; text-align:left; }
+.up-bar     { grid-column: 1 / -1; height:6px; border-radius:3px; background: rgba(var(--box-bg-color), .6); overflow:hidden; }
+.up-bar > div { height:100%; background: rgb(24,151,78); }
+.up-rate    { text-align:right; opacity:.8; }
 
 /* ===== Status badge ===== */
 .badge { display:inline-block; min-width: 98px; padding: 6px 12px; border-radius: 999px; font-weight: 800; color:#cfd6df; }
@@ -265,6 +302,25 @@ div[data-testid="stVerticalBlock"]:has(#steps-anchor)::after {
 .progress-bar   { height:100%; width:0%; background: rgb(24,151,78); transition: width .12s linear; }
 .progress-label { position:absolute; inset:0; display:flex; align-items:center; justify-content:center; font-weight:800; }
 
+/* ===== Rate limiter chips ===== */
+.rl-row  { display:flex; flex-wrap:wrap; gap:8px; margin-top:10px; }
+.rl-chip { font-size:13px; padding:4px 10px; border-radius:999px; background: rgba(var(--card-bg-color), .35);
+           border: 1px solid rgba(var(--card-border-color), var(--card-border-alpha)); opacity:.9; }
+.rl-chip.throttled { border-color: rgba(220,150,60,.9); }
+
+/* ===== Worker load rows ===== */
+.wk-summary { opacity:.85; margin-bottom:10px; }
+.wk-row     { display:grid; grid-template-columns: 280px 1fr 300px; gap:14px; align-items:center; margin:6px 0; }
+.wk-id      { font-family: ui-monospace, Consolas, monospace; font-size:13px; opacity:.9; overflow:hidden; text-overflow:ellipsis; }
+.wk-stats   { font-size:13px; opacity:.8; }
+
+/* ===== Artifacts gallery ===== */
+.ag-tile { width:160px; height:90px; display:flex; align-items:center; justify-content:center; border-radius:8px;
+           background: rgba(var(--card-bg-color), .35); border: 1px dashed rgba(var(--card-border-color), var(--card-border-alpha));
+           font-size:13px; opacity:.8; }
+.ag-name { font-size:12px; opacity:.7; margin-top:4px; overflow:hidden; text-overflow:ellipsis; white-space:nowrap; }
+.ag-info { font-size:13px; opacity:.7; text-align:center; padding-top:8px; }
+
 /* ===== Size knobs ===== */
 /* Buttons (IDs come from stylable_container) */
 #btn-start button,
@@ -289,6 +345,7 @@ div[data-testid="stVerticalBlock"]:has(#steps-anchor)::after {
 
 /* Progress bar uses the central knobs */
 .progress-wrap  { height: var(--pb-height) !important; border-radius: var(--pb-radius) !important; }
+.progress-wrap.wk-bar { height: 22px !important; margin: 0; }
 .progress-bar   { border-radius: var(--pb-radius) !important; }
 .progress-label { font-size: var(--pb-font) !important; font-weight: 800; }
 </style>
@@ -305,30 +362,98 @@ if "running" not in st.session_state:
     st.session_state.step_index = 0
     st.session_state.step_started = None
     st.session_state.progress = 0.0
-    st.session_state.logs = []
-    st.session_state.step_states = ["idle", "idle", "idle", "idle", "idle"]
+    st.session_state.step_fraction = 0.0
+    st.session_state.step_fraction_ts = None
+    st.session_state.log_index = LogIndex()
+    st.session_state.step_states = ["idle"] * len(pipeline.STEPS)
+    st.session_state.transfers = {}    # upload destination -> (sent, total, B/s, done)
+    # Pipeline worker + its event subscription (events.py)
+    st.session_state.sub = None
+    st.session_state.worker = None
+    st.session_state.stop_event = None
+    st.session_state.stop_latency = None
+    st.session_state.recorder = None
+    st.session_state.replaying = False   # replayed / synthetic timings must not reach the ETA history
+    # Adaptive refresh (live_clock.py): time of the last transition / log line, rerun counter
+    st.session_state.last_activity = 0.0
+    st.session_state.clock_seq = 0
+    st.session_state.progress_sync = ProgressSync()
+    # Artifacts gallery: listing (refreshed when Image Generation / File Download change state), page
+    st.session_state.artifacts = None
+    st.session_state.artifacts_key = None
+    st.session_state.gallery_page = 0
     # Store glassmorphic values for iframe access
     st.session_state.glass_alpha = 0.15
     st.session_state.glass_blur = 12
 
-STEPS = [
-    {"title": "Story Creation", "desc": "Generating story using ChatGPT API", "duration": 3.0},
-    {"title": "Image Generation", "desc": "Creating visual content", "duration": 3.0},
-    {"title": "Narration Generation", "desc": "Generating voice narration", "duration": 3.0},
-    {"title": "Caption Generation", "desc": "Creating subtitles and captions", "duration": 3.0},
-    {"title": "File Download", "desc": "Downloading completed video file", "duration": 3.0},
-]
+STEPS = pipeline.STEPS
+LOG_LEVELS = ["INFO", "SUCCESS", "WARNING", "ERROR"]
+LOG_RANGES = {"All time": None, "Last minute": 60, "Last 5 min": 300, "Last 15 min": 900, "Last hour": 3600}
+LOG_PAGE = 400
+GALLERY_COLS, GALLERY_ROWS = 4, 2
+GALLERY_POLL = 0.5      # s between reruns while thumbnails of the shown page are being made
+ARTIFACT_STEPS = [pipeline.STEP_KEYS.index(k) for k in ("image_generation", "file_download")]
+UPLOAD_POLL = 0.5       # s between reruns while uploads are in flight (per-destination progress)
+
+
+@st.cache_resource
+def job_queue():
+    # Worker-mode dashboard: STORYMORPH_JOBS_DB points at the shared work table (job_worker.py)
+    path = os.environ.get("STORYMORPH_JOBS_DB")
+    if not path: return None
+    from job_queue import JobQueue
+    return JobQueue(path)
+
+
+def styled(key, css):
+    # streamlit_extras is optional and only imported once the first paint is out
+    if not first_paint:
+        try:
+            from streamlit_extras.stylable_container import stylable_container
+            return stylable_container(key, css_styles=css)
+        except ImportError:
+            pass
+    return st.container()
+
+
+@st.cache_resource
+def thumbnails():
+    # Process-wide thumbnail workers + disk cache; the browser loads the cached PNGs, so no pixels are kept
+    return ThumbnailCache()
+
+
+@st.cache_resource
+def log_sink():
+    # Process-wide structured export of every log line (log_sink.py); None when disabled
+    return default_sink("streamlit")
+
+
+@st.cache_resource
+def duration_model():
+    # Process-wide: learned step durations persist across sessions and runs
+    return DurationModel.load()
 
 
 # =========================
 # Helpers
 # =========================
-def add_log(level: str, msg: str):
-    st.session_state.logs.append((datetime.now().strftime("%H:%M:%S"), level, msg))
+def add_log(level: str, msg: str, ts: float = None, step: str = None):
+    ts = ts or time.time()
+    st.session_state.log_index.add(ts, level, step, msg)
+    sink = log_sink()
+    if sink: sink.emit(ts, level, msg, step)   # in-memory enqueue; written by the sink's thread
+
+
+def _close_worker():
+    if st.session_state.stop_event: st.session_state.stop_event.set()
+    if st.session_state.sub: st.session_state.sub.close()
+    if st.session_state.recorder: st.session_state.recorder.close()
+    st.session_state.sub = st.session_state.worker = st.session_state.stop_event = st.session_state.recorder = None
 
 
 def start():
     if st.session_state.running: return
+    _close_worker()
     st.session_state.running = True
     st.session_state.stop_flag = False
     st.session_state.error = False
@@ -336,19 +461,43 @@ def start():
     st.session_state.step_index = 0
     st.session_state.step_started = datetime.now()
     st.session_state.progress = 0.0
-    st.session_state.step_states = ["idle", "idle", "idle", "idle", "idle"]
-    st.session_state.logs = []
-    add_log("INFO", "Initializing ChatGPT API connection")
-    add_log("INFO", "Sending story generation prompt")
+    st.session_state.step_fraction = 0.0
+    st.session_state.step_fraction_ts = None
+    st.session_state.step_states = ["idle"] * len(STEPS)
+    st.session_state.transfers = {}
+    st.session_state.log_index = LogIndex()
+    st.session_state.stop_latency = None
+    bus = EventBus()
+    st.session_state.sub = bus.subscribe(maxsize=256)
+    st.session_state.stop_event = CancelToken()
+    st.session_state.recorder = recorder_from_env(bus, "streamlit")
+    replay = source_from_env()
+    st.session_state.replaying = bool(replay)
+    if replay:
+        stream, speed = replay
+        st.session_state.worker = replay_in_thread(stream, bus, speed, stop=st.session_state.stop_event)
+        return
+    from backend import default_client   # only needed once a job runs
+    from uploads import default_uploader
+    st.session_state.worker = pipeline.run_job_in_thread(
+        0, "", bus, stop=st.session_state.stop_event, backend=default_client(), uploader=default_uploader())
 
 
 def stop():
+    # Hard cancel: aborts in-flight backend requests, waits (bounded) until the worker is quiescent
     st.session_state.stop_flag = True
     st.session_state.running = False
-    add_log("INFO", "Pipeline stopped by user")
+    token = st.session_state.stop_event
+    if token:
+        token.cancel()
+        token.wait_quiescent(CLEANUP_DEADLINE + 0.5)
+        st.session_state.stop_latency = token.stop_latency
+    if st.session_state.worker: st.session_state.worker.join(timeout=0.5)
+    pump()
 
 
 def reset():
+    _close_worker()
     st.session_state.running = False
     st.session_state.stop_flag = False
     st.session_state.error = False
@@ -356,38 +505,57 @@ def reset():
     st.session_state.step_index = 0
     st.session_state.step_started = None
     st.session_state.progress = 0.0
-    st.session_state.logs = []
-    st.session_state.step_states = ["idle", "idle", "idle", "idle", "idle"]
-
-
-def tick():
-    if not st.session_state.running or st.session_state.stop_flag or st.session_state.error:
-        return
-    idx = st.session_state.step_index
-    if idx >= len(STEPS):
+    st.session_state.step_fraction = 0.0
+    st.session_state.step_fraction_ts = None
+    st.session_state.stop_latency = None
+    st.session_state.log_index = LogIndex()
+    st.session_state.step_states = ["idle"] * len(STEPS)
+    st.session_state.transfers = {}
+
+
+def apply_event(ev):
+    ss = st.session_state
+    model = duration_model()
+    if not isinstance(ev, (StepProgress, TransferProgress)): ss.last_activity = time.monotonic()
+    if isinstance(ev, LogRecord):
+        add_log(ev.level, ev.msg, ev.ts, ev.step)
+    elif isinstance(ev, TransferProgress):
+        ss.transfers[ev.dest] = (ev.sent, ev.total, ev.rate, ev.done)
+    elif isinstance(ev, StepStarted):
+        ss.step_index = ev.index
+        ss.step_started = datetime.fromtimestamp(ev.ts)
+        ss.step_fraction, ss.step_fraction_ts = 0.0, ev.ts
+        ss.progress = model.progress(ev.index, 0.0)
+    elif isinstance(ev, StepProgress):
+        ss.step_fraction, ss.step_fraction_ts = ev.value, ev.ts
+        ss.progress = model.progress(ev.index, ev.value)
+    elif isinstance(ev, StepFinished):
+        if ev.ok:
+            if not ss.replaying: model.observe(ev.step, ev.elapsed)
+            ss.step_states[ev.index] = "done"
+            ss.step_index = ev.index + 1
+            ss.step_fraction, ss.step_fraction_ts = 0.0, ev.ts
+            ss.progress = model.progress(ss.step_index, 0.0)
+            if ss.step_index == len(STEPS) and not ss.replaying: model.save()
+        elif ev.status == StepFinished.FAILED:
+            ss.step_states[ev.index] = "error"
+            ss.error = True
+            ss.running = False
+
+
+def pump():
+    # Drain whatever the worker published since the last rerun (never blocks the worker)
+    sub = st.session_state.sub
+    if sub is None: return
+    for ev in sub.drain():
+        apply_event(ev)
+    worker = st.session_state.worker
+    if st.session_state.running and not (worker and worker.is_alive()) and not len(sub):
         st.session_state.running = False
-        add_log("SUCCESS", "Workflow completed.")
-        return
-
-    step = STEPS[idx]
-    elapsed = (datetime.now() - st.session_state.step_started).total_seconds()
-    step_pct = min(1.0, elapsed / step["duration"])
-    st.session_state.progress = (idx + step_pct) / len(STEPS)
+        if st.session_state.recorder: st.session_state.recorder.close(); st.session_state.recorder = None
 
-    if abs(elapsed) < 0.12:
-        add_log("INFO", f"Step {idx + 1}/{len(STEPS)}: {step['desc']}")
 
-    if step_pct >= 1.0:
-        # Only update state if it's actually changing
-        if st.session_state.step_states[idx] != "done":
-            st.session_state.step_states[idx] = "done"
-            add_log("SUCCESS", f"{step['title']} completed.")
-        st.session_state.step_index += 1
-        if st.session_state.step_index < len(STEPS):
-            st.session_state.step_started = datetime.now()
-        else:
-            st.session_state.running = False
-            add_log("SUCCESS", "Workflow completed.")
+pump()
 
 
 # =========================
@@ -412,11 +580,15 @@ with col_status:
     status_text = "Running" if st.session_state.running else ("Error" if st.session_state.error else "Idle")
     badge_class = "badge running" if st.session_state.running else (
         "badge error" if st.session_state.error else "badge idle")
+    stop_latency = st.session_state.get("stop_latency")
+    stop_html = (f'<div style="opacity:.7; margin-top:8px; font-size:13px;">Stopped in {stop_latency * 1000:.0f} ms</div>'
+                 if stop_latency is not None else "")
     st.markdown(f"""
         <div class="card top">
           <div>
             <div style="opacity:.85; margin-bottom:8px;">Current</div>
             <span class="{badge_class}">{status_text}</span>
+            {stop_html}
           </div>
         </div>
     """, unsafe_allow_html=True)
@@ -425,16 +597,28 @@ with col_timing:
     st.markdown('<div class="section-title center">Timing</div>', unsafe_allow_html=True)
     started = st.session_state.start_time.strftime("%H:%M:%S") if st.session_state.start_time else "--:--:--"
     if st.session_state.start_time:
-        delta = datetime.now() - st.session_state.start_time
-        duration_text = "less than a minute" if delta < timedelta(
-            minutes=1) else f"{int(delta.total_seconds() // 60)} min"
+        # M:SS; the browser keeps it ticking between reruns (live_clock)
+        elapsed_s = (datetime.now() - st.session_state.start_time).total_seconds()
+        duration_text = f"{int(elapsed_s // 60)}:{int(elapsed_s % 60):02d}"
     else:
+        elapsed_s = None
         duration_text = "–"
+    if st.session_state.running and st.session_state.step_started:
+        # Expected completion from learned step durations, with p10–p90 range
+        in_step = (datetime.now() - st.session_state.step_started).total_seconds()
+        eta_mean, eta_lo, eta_hi = duration_model().remaining(st.session_state.step_index, in_step)
+        now = datetime.now()
+        eta_text = (f"{(now + timedelta(seconds=eta_mean)).strftime('%H:%M:%S')} "
+                    f"<span style='opacity:.6'>({(now + timedelta(seconds=eta_lo)).strftime('%H:%M:%S')}"
+                    f" – {(now + timedelta(seconds=eta_hi)).strftime('%H:%M:%S')})</span>")
+    else:
+        eta_text = "--:--:--"
     st.markdown(f"""
         <div class="card top">
           <div>
             <div style="margin-bottom:6px;">Started &nbsp; <span style="opacity:.9">{started}</span></div>
-            <div>Duration &nbsp; <span style="opacity:.9">{duration_text}</span></div>
+            <div style="margin-bottom:6px;">Duration &nbsp; <span id="dur-live" style="opacity:.9">{duration_text}</span></div>
+            <div>ETA &nbsp; <span style="opacity:.9">{eta_text}</span></div>
           </div>
         </div>
     """, unsafe_allow_html=True)
@@ -450,9 +634,9 @@ with st.container():
 
     # --- START (green / dim green when disabled) ---
     with c1:
-        with stylable_container(
+        with styled(
                 "btn-start",
-                css_styles="""
+                """
                 button {
                     background: rgba(var(--btn-start-bg), var(--btn-start-alpha)) !important;
                     border-width: calc(var(--use-borders) * var(--border-width-on) + (1 - var(--use-borders)) * var(--border-width-off)) !important;
@@ -478,9 +662,9 @@ with st.container():
 
     # --- STOP (red / dim red when disabled) ---
     with c2:
-        with stylable_container(
+        with styled(
                 "btn-stop",
-                css_styles="""
+                """
                 button {
                     background: rgba(var(--btn-stop-bg), var(--btn-stop-alpha)) !important;
                     border-width: calc(var(--use-borders) * var(--border-width-on) + (1 - var(--use-borders)) * var(--border-width-off)) !important;
@@ -506,9 +690,9 @@ with st.container():
 
     # --- RESET (black / dim black when disabled) ---
     with c3:
-        with stylable_container(
+        with styled(
                 "btn-reset",
-                css_styles="""
+                """
                 button {
                     background: rgba(var(--btn-reset-bg), var(--btn-reset-alpha)) !important;
                     border-width: calc(var(--use-borders) * var(--border-width-on) + (1 - var(--use-borders)) * var(--border-width-off)) !important;
@@ -537,23 +721,32 @@ with st.container():
     # Progress (unchanged)
     st.markdown('<div class="section-title" style="margin: 2px 0 8px 0;">Progress Tracker</div>',
                 unsafe_allow_html=True)
-    pct = int(st.session_state.progress * 100)
-    st.markdown(f"""
-        <div class="progress-wrap">
-          <div class="progress-bar" style="width:{pct}%;"></div>
-          <div class="progress-label">{pct}%</div>
-        </div>
-    """, unsafe_allow_html=True)
+    # Animated in the browser from step start + expected duration; new parameters only on
+    # transitions and when reported progress drifts from the animation (live_clock.ProgressSync)
+    ss = st.session_state
+    live = ss.running and not ss.stop_flag and not ss.error
+    weights = [duration_model().expected(s["key"])[0] for s in STEPS]
+    live_progress(ss.progress_sync.update(weights, ss.step_index, ss.step_fraction, ss.step_fraction_ts, live))
+
+    # Rate limiter state (process-wide token buckets; only upstreams that have been called)
+    limits = rate_limit_snapshot()
+    if limits:
+        chips = "".join(
+            f'<div class="rl-chip{" throttled" if b["rate"] < b["max_rate"] or b["queue_depth"] else ""}">'
+            f'<b>{escape(b["name"])}</b> &nbsp;{b["rate"]:g}/{b["max_rate"]:g} req/s · '
+            f'{max(0.0, b["tokens"]):.1f} tokens · queue {b["queue_depth"]} · '
+            f'throttled {b["throttled_s"]:.1f}s · 429×{b["throttles"]}</div>'
+            for b in limits)
+        st.markdown(f'<div class="rl-row">{chips}</div>', unsafe_allow_html=True)
 
 # =========================
-# WORKFLOW STEPS (group box) - Now with 5 steps
+# WORKFLOW STEPS (group box) - one card per pipeline step
 # =========================
 st.markdown('<div class="section-title">&nbsp&nbspWorkflow Steps</div>', unsafe_allow_html=True)
 with st.container():
     st.markdown('<div id="steps-anchor"></div>', unsafe_allow_html=True)
 
-    s1, s2, s3, s4, s5 = st.columns(5, gap="small")
-    for i, col in enumerate((s1, s2, s3, s4, s5)):
+    for i, col in enumerate(st.columns(len(STEPS), gap="small")):
         step = STEPS[i]
         state = st.session_state.step_states[i]
         card_cls = "card step-card" if state == "idle" else (
@@ -561,20 +754,103 @@ with st.container():
         with col:
             # Use a container with a key to prevent flickering
             container_key = f"step_card_{i}"
+            transfers = "".join(
+                f'<div class="up-row"><span>{escape(dest)}</span>'
+                f'<span class="up-rate">{"✓ " if done else ""}{sent * 100 // max(1, total)}% · {rate / 1e6:.1f} MB/s</span>'
+                f'<div class="up-bar"><div style="width:{sent * 100 / max(1, total):.1f}%"></div></div></div>'
+                for dest, (sent, total, rate, done) in ss.transfers.items()) if step["key"] == "upload" else ""
             st.markdown(f"""
                 <div class="{card_cls}" key="{container_key}">
                   <span class="step-title">{step["title"]}</span>
-                  <div class="step-desc">{step["desc"]}</div>
+                  <div class="step-desc">{step["desc"]}</div>{transfers}
                 </div>
             """, unsafe_allow_html=True)
 
+# =========================
+# Workers (only when a shared work table is configured)
+# =========================
+if job_queue() is not None:
+    counts = job_queue().counts()
+    st.markdown('<div class="section-title">&nbsp&nbspWorkers</div>', unsafe_allow_html=True)
+    summary = " · ".join(f"{k} {counts.get(k, 0)}" for k in ("queued", "running", "done", "failed"))
+    rows = "".join(f'''
+        <div class="wk-row">
+          <div class="wk-id">{escape(w["id"])}</div>
+          <div class="progress-wrap wk-bar">
+            <div class="progress-bar" style="width:{int(w["load"] * 100)}%;"></div>
+            <div class="progress-label">{w["running"]}/{w["capacity"]}</div>
+          </div>
+          <div class="wk-stats">{w["done"]} done · {w["failed"]} failed · heartbeat {w["heartbeat_age"]:.0f}s ago</div>
+        </div>''' for w in job_queue().workers())
+    st.markdown(f'<div class="card"><div class="wk-summary">{summary}</div>'
+                f'{rows or "<div class=wk-stats>No live workers</div>"}</div>', unsafe_allow_html=True)
+
+# =========================
+# Artifacts (thumbnails of the shown page only, made by background workers; thumbnails.py)
+# =========================
+artifacts_key = tuple(ss.step_states[i] for i in ARTIFACT_STEPS)
+if ss.artifacts is None or artifacts_key != ss.artifacts_key:
+    ss.artifacts, ss.artifacts_key = list_artifacts(), artifacts_key
+thumbs_pending = 0
+if ss.artifacts:
+    st.markdown('<div class="section-title">&nbsp&nbspArtifacts</div>', unsafe_allow_html=True)
+    page_size = GALLERY_COLS * GALLERY_ROWS
+    nav_prev, nav_info, nav_next, nav_refresh = st.columns([1, 4, 1, 1], gap="small")
+    if nav_refresh.button("Refresh", key="ag_refresh", use_container_width=True):
+        thumbnails().forget(); ss.artifacts = list_artifacts()
+    pages = max(1, -(-len(ss.artifacts) // page_size))
+    if nav_prev.button("◀", key="ag_prev", use_container_width=True, disabled=ss.gallery_page == 0):
+        ss.gallery_page -= 1
+    if nav_next.button("▶", key="ag_next", use_container_width=True, disabled=ss.gallery_page >= pages - 1):
+        ss.gallery_page += 1
+    ss.gallery_page = max(0, min(ss.gallery_page, pages - 1))
+    shown = ss.artifacts[ss.gallery_page * page_size:(ss.gallery_page + 1) * page_size]
+    thumbs_pending = thumbnails().want([p for p, _ in shown])
+    nav_info.markdown(f'<div class="ag-info">page {ss.gallery_page + 1}/{pages} · {len(ss.artifacts)} artifacts</div>',
+                      unsafe_allow_html=True)
+    for r in range(0, len(shown), GALLERY_COLS):
+        for col, (path, kind) in zip(st.columns(GALLERY_COLS, gap="small"), shown[r:r + GALLERY_COLS]):
+            name = os.path.relpath(path, OUTPUT_DIR)
+            thumb = thumbnails().entry(path)
+            with col:
+                if thumb is not None and thumb.ok:
+                    st.image(thumb.png, caption=name)
+                else:
+                    label = "…" if thumb is None else ("▶ video" if kind == "video" else "image")
+                    st.markdown(f'<div class="ag-tile">{label}</div><div class="ag-name">{escape(name)}</div>',
+                                unsafe_allow_html=True)
+
 # =========================
 # Live Logs (iframe; no bullets; timestamp centered under pill)
 # =========================
 st.markdown('<div class="section-title">&nbsp&nbsp&nbsp&nbspLive Logs</div>', unsafe_allow_html=True)
 
+# Filters run against the incremental log index (log_index.py): newest page first, shown oldest -> newest
+f_level, f_step, f_text, f_range = st.columns([2, 3, 3, 1.4], gap="small")
+with f_level:
+    levels = st.multiselect("Level", LOG_LEVELS, key="log_levels", placeholder="All levels")
+with f_step:
+    steps = st.multiselect("Step", pipeline.STEP_KEYS, key="log_steps", placeholder="All steps",
+                           format_func=lambda k: STEPS[pipeline.STEP_KEYS.index(k)]["title"])
+with f_text:
+    query = st.text_input("Search", key="log_text", placeholder="words in the message…")
+with f_range:
+    window = LOG_RANGES[st.selectbox("Time", list(LOG_RANGES), key="log_range")]
+index = st.session_state.log_index
+hits = index.search(levels=levels, steps=steps, text=query, limit=LOG_PAGE,
+                    since=time.time() - window if window else None)
+sink_stats = log_sink().stats() if log_sink() else None
+if levels or steps or query or window or len(index) > LOG_PAGE or (sink_stats and sink_stats["dropped"]):
+    more = "+" if len(hits) == LOG_PAGE else ""
+    dropped = (f' · <span style="color:rgb(220,150,60)">{sink_stats["dropped"]} not exported (disk too slow)</span>'
+               if sink_stats and sink_stats["dropped"] else "")
+    st.markdown(f'<div style="opacity:.7; font-size:13px; margin:-4px 0 6px 4px;">'
+                f'{len(hits)}{more} of {len(index)} records{dropped}</div>', unsafe_allow_html=True)
+
 entries = []
-for ts, level, msg in st.session_state.logs[-400:]:
+for rid in reversed(hits):
+    rts, level, _, msg = index.record(rid)
+    ts = datetime.fromtimestamp(rts).strftime("%H:%M:%S")
     klass = "success" if level == "SUCCESS" else ("error" if level == "ERROR" else "")
     pill = " success" if klass == "success" else (" error" if klass == "error" else "")
     entries.append(
@@ -644,9 +920,21 @@ logs_html = f"""
 st_html(logs_html, height=440, scrolling=False)
 
 # =========================
-# Sim loop
+# Refresh (the browser schedules reruns; pump() applies the worker's events on each one)
 # =========================
-if st.session_state.running and not st.session_state.stop_flag and not st.session_state.error:
-    tick()
-    time.sleep(0.0002)
-    st.rerun()
+step_remaining = None
+if live and ss.step_started and ss.step_index < len(STEPS):
+    step_remaining = weights[ss.step_index] - (datetime.now() - ss.step_started).total_seconds()
+ss.clock_seq += 1
+interval = refresh_interval(live, time.monotonic() - ss.last_activity, step_remaining,
+                            idle=HEARTBEAT if job_queue() is not None else 0.0)   # worker dashboard: poll the table
+if thumbs_pending: interval = min(interval or GALLERY_POLL, GALLERY_POLL)
+if live and any(not t[3] for t in ss.transfers.values()): interval = min(interval or UPLOAD_POLL, UPLOAD_POLL)
+if first_paint:
+    # The plain first paint is out: report it, then rerun right away for the full styling
+    boot.mark("first page")
+    add_log("INFO", f"{boot.summary()} · this session's first page {(time.perf_counter() - RUN_T0) * 1000:.0f} ms")
+    boot.report()
+    ss.booted = True
+    interval = 0.05
+live_clock(interval, running=live, elapsed=elapsed_s if live else None, seq=ss.clock_seq)
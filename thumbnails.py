@@ -0,0 +1,303 @@
+# thumbnails.py — downscaled previews of generated images and videos for the artifact galleries
+# - Artifacts: image / video files under the output directory (STORYMORPH_OUTPUT_DIR or
+#   ~/.storymorph/output), newest first
+# - Thumbnails are made by a small pool of worker threads and cached on disk as PNG files named by
+#   the source's content hash: a re-run, a second GUI or a renamed file costs no decode
+# - Only what a GUI asks for is made: want(paths) replaces the pending requests with the items that
+#   are visible now, so items scrolled past before a worker got to them are never decoded
+# - Decoded pixels (keep_pixels=True, for GPU textures) live in an LRU bounded by MEMORY_BYTES;
+#   otherwise only the cache file's path is kept
+# - Decoders: Pillow when installed (JPEG is downscaled while decoding), ffmpeg for videos (and for
+#   images without Pillow), else a stdlib PNG reader; anything else gets a placeholder tile
+
+import hashlib, os, shutil, struct, subprocess, threading, zlib
+from collections import OrderedDict, deque
+
+OUTPUT_DIR = os.environ.get("STORYMORPH_OUTPUT_DIR", os.path.join(os.path.expanduser("~"), ".storymorph", "output"))
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".storymorph", "thumbnails")
+THUMB_SIZE = (160, 90)          # bounding box (px); aspect ratio is kept
+WORKERS = 2
+MEMORY_BYTES = 16 << 20         # decoded RGBA kept in memory (keep_pixels=True)
+VIDEO_SEEK = 1.0                # s into a video for its preview frame
+FFMPEG_TIMEOUT = 20.0
+IMAGE_EXT = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp"}
+VIDEO_EXT = {".mp4", ".mov", ".mkv", ".webm", ".avi"}
+FFMPEG = shutil.which("ffmpeg")
+
+
+def artifact_kind(path):
+    ext = os.path.splitext(path)[1].lower()
+    return "image" if ext in IMAGE_EXT else ("video" if ext in VIDEO_EXT else None)
+
+
+def list_artifacts(directory=OUTPUT_DIR):
+    """[(path, kind)] of every image / video below directory, newest first."""
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != CACHE_DIR]
+        for f in files:
+            kind = artifact_kind(f)
+            if kind is None: continue
+            p = os.path.join(root, f)
+            try: found.append((os.stat(p).st_mtime, p, kind))
+            except OSError: pass        # removed while listing
+    found.sort(reverse=True)
+    return [(p, kind) for _, p, kind in found]
+
+
+# ---------------- PNG (stdlib) ----------------
+def _chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def write_png(path, width, height, rgba, level=6):
+    """8-bit RGBA PNG, written atomically (readers never see a partial file)."""
+    stride = width * 4
+    raw = b"".join(b"\x00" + rgba[y * stride:(y + 1) * stride] for y in range(height))
+    data = (b"\x89PNG\r\n\x1a\n" + _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+            + _chunk(b"IDAT", zlib.compress(raw, level)) + _chunk(b"IEND", b""))
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f: f.write(data)
+    os.replace(tmp, path)
+
+
+def png_size(path):
+    with open(path, "rb") as f: head = f.read(24)
+    return struct.unpack(">II", head[16:24])
+
+
+def _unfilter(ftype, row, prev, bpp):
+    if ftype == 0: return row
+    out = bytearray(row)
+    if ftype == 2:
+        for i in range(len(out)): out[i] = (out[i] + prev[i]) & 255
+        return out
+    for i in range(len(out)):
+        a = out[i - bpp] if i >= bpp else 0
+        if ftype == 1: out[i] = (out[i] + a) & 255
+        elif ftype == 3: out[i] = (out[i] + ((a + prev[i]) >> 1)) & 255
+        else:                                   # 4: Paeth
+            b = prev[i]; c = prev[i - bpp] if i >= bpp else 0
+            p = a + b - c; pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+            out[i] = (out[i] + (a if pa <= pb and pa <= pc else (b if pb <= pc else c))) & 255
+    return out
+
+
+def read_png(data):
+    """(width, height, RGBA bytes) of an 8-bit, non-interlaced gray / RGB / RGBA PNG; ValueError otherwise."""
+    if data[:8] != b"\x89PNG\r\n\x1a\n": raise ValueError("not a PNG")
+    pos, idat, header = 8, [], None
+    while pos < len(data):
+        n, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + n]; pos += 12 + n
+        if kind == b"IHDR": header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"IDAT": idat.append(body)
+        elif kind == b"IEND": break
+    if header is None: raise ValueError("PNG without IHDR")
+    w, h, depth, color, _, _, interlace = header
+    channels = {0: 1, 2: 3, 4: 2, 6: 4}.get(color)
+    if depth != 8 or interlace or channels is None: raise ValueError("unsupported PNG format")
+    raw = zlib.decompress(b"".join(idat))
+    stride = w * channels
+    out = bytearray(w * h * 4)
+    prev = bytes(stride)
+    for y in range(h):
+        base = y * (stride + 1)
+        row = _unfilter(raw[base], raw[base + 1:base + 1 + stride], prev, channels); prev = row
+        o = y * w * 4
+        if channels == 4: out[o:o + w * 4] = row; continue
+        gray = channels <= 2
+        for c in range(3): out[o + c:o + w * 4:4] = row[0 if gray else c::channels]
+        out[o + 3:o + w * 4:4] = row[1::2] if channels == 2 else b"\xff" * w
+    return w, h, bytes(out)
+
+
+def fit(width, height, size=THUMB_SIZE):
+    scale = min(size[0] / width, size[1] / height, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _downscale(w, h, rgba, size):
+    # nearest-neighbour sampling; only used for sources the stdlib reader had to decode at full size
+    tw, th = fit(w, h, size)
+    if (tw, th) == (w, h): return w, h, rgba
+    xs = [min(w - 1, int((x + 0.5) * w / tw)) * 4 for x in range(tw)]
+    rows = []
+    for y in range(th):
+        sy = min(h - 1, int((y + 0.5) * h / th)) * w * 4
+        rows.append(b"".join(rgba[sy + x:sy + x + 4] for x in xs))
+    return tw, th, b"".join(rows)
+
+
+# ---------------- Decoders ----------------
+_pil = []
+def _pillow():
+    if not _pil:
+        try:
+            from PIL import Image
+            _pil.append(Image)
+        except ImportError:
+            _pil.append(None)
+    return _pil[0]
+
+
+def _decode_pillow(path, size):
+    with _pillow().open(path) as im:
+        im.draft("RGB", size)          # JPEG: decode at a reduced scale
+        im.thumbnail(size)
+        im = im.convert("RGBA")
+        return im.width, im.height, im.tobytes()
+
+
+def _decode_ffmpeg(path, size, seek=None):
+    cmd = [FFMPEG, "-v", "error", "-nostdin"] + (["-ss", f"{seek:g}"] if seek else []) + [
+        "-i", path, "-frames:v", "1", "-vf", f"scale={size[0]}:{size[1]}:force_original_aspect_ratio=decrease",
+        "-f", "image2pipe", "-vcodec", "png", "-"]
+    out = subprocess.run(cmd, capture_output=True, timeout=FFMPEG_TIMEOUT).stdout
+    if not out:
+        if seek: return _decode_ffmpeg(path, size)      # shorter than the seek point
+        raise ValueError("ffmpeg produced no frame")
+    return read_png(out)
+
+
+def _decode_stdlib(path, size):
+    with open(path, "rb") as f: return _downscale(*read_png(f.read()), size)
+
+
+def decoder_for(path, kind):
+    """Decoding function (path, size) -> (w, h, rgba), or None when nothing here can decode it."""
+    if kind == "video":
+        return (lambda p, s: _decode_ffmpeg(p, s, VIDEO_SEEK)) if FFMPEG else None
+    if _pillow() is not None: return _decode_pillow
+    if FFMPEG: return _decode_ffmpeg
+    return _decode_stdlib if path.lower().endswith(".png") else None
+
+
+# ---------------- Cache ----------------
+class Thumbnail:
+    __slots__ = ("width", "height", "png", "error", "sig")
+
+    def __init__(self, width=0, height=0, png=None, error=None, sig=None):
+        self.width, self.height, self.png, self.error, self.sig = width, height, png, error, sig
+
+    @property
+    def ok(self): return self.error is None
+
+
+class ThumbnailCache:
+    def __init__(self, cache_dir=CACHE_DIR, size=THUMB_SIZE, workers=WORKERS, memory_bytes=MEMORY_BYTES,
+                 keep_pixels=False):
+        self.cache_dir, self.size = cache_dir, tuple(size)
+        self.memory_bytes, self.keep_pixels = memory_bytes, keep_pixels
+        os.makedirs(cache_dir, exist_ok=True)
+        self._cv = threading.Condition()
+        self._queue = deque(); self._working = set()
+        self._entries = {}                  # path -> Thumbnail (cache file, no pixels)
+        self._pixels = OrderedDict()        # path -> RGBA bytes, LRU
+        self._pixel_bytes = 0
+        self._hashes = {}                   # (path, size, mtime_ns) -> content hash
+        self._closed = False
+        self.decoded = self.disk_hits = self.skipped = 0
+        self._threads = [threading.Thread(target=self._run, name=f"thumbs-{i}", daemon=True) for i in range(workers)]
+        for t in self._threads: t.start()
+
+    # ---------------- GUI side (any thread) ----------------
+    def _needed(self, path):
+        e = self._entries.get(path)
+        return e is None or (self.keep_pixels and e.ok and path not in self._pixels)
+
+    def want(self, paths):
+        """Paths visible now, most important first. Pending requests for anything else are dropped."""
+        with self._cv:
+            todo = [p for p in dict.fromkeys(paths) if p not in self._working and self._needed(p)]
+            keep = set(todo)
+            self.skipped += sum(1 for p in self._queue if p not in keep)
+            self._queue = deque(todo)
+            if todo: self._cv.notify_all()
+            return len(todo) + len(self._working)
+
+    def entry(self, path):
+        """Thumbnail (cache file, size, error) once made, else None."""
+        return self._entries.get(path)
+
+    def pixels(self, path):
+        """(width, height, RGBA bytes) when in memory (keep_pixels=True), else None."""
+        with self._cv:
+            data = self._pixels.get(path)
+            if data is None: return None
+            self._pixels.move_to_end(path)
+            e = self._entries[path]
+            return e.width, e.height, data
+
+    def forget(self, paths=None):
+        """Drop entries (all when paths is None), e.g. after the output directory was cleaned."""
+        with self._cv:
+            for p in list(self._entries) if paths is None else paths:
+                self._entries.pop(p, None)
+                data = self._pixels.pop(p, None)
+                if data is not None: self._pixel_bytes -= len(data)
+
+    def stats(self):
+        return {"entries": len(self._entries), "queued": len(self._queue), "working": len(self._working),
+                "memory_bytes": self._pixel_bytes, "decoded": self.decoded, "disk_hits": self.disk_hits,
+                "skipped": self.skipped}
+
+    def close(self):
+        with self._cv:
+            self._closed = True; self._queue.clear(); self._cv.notify_all()
+
+    # ---------------- workers ----------------
+    def _run(self):
+        while True:
+            with self._cv:
+                while not self._queue and not self._closed: self._cv.wait()
+                if self._closed: return
+                path = self._queue.popleft(); self._working.add(path)
+            data = None
+            try:
+                entry, data = self._make(path)
+            except Exception as e:              # unreadable / corrupt / decoder failure: placeholder tile
+                entry = Thumbnail(error=str(e) or type(e).__name__)
+            with self._cv:
+                self._working.discard(path)
+                self._entries[path] = entry
+                if data is not None: self._remember(path, data)
+
+    def _remember(self, path, data):
+        old = self._pixels.pop(path, None)
+        if old is not None: self._pixel_bytes -= len(old)
+        self._pixels[path] = data; self._pixel_bytes += len(data)
+        while self._pixel_bytes > self.memory_bytes and len(self._pixels) > 1:
+            self._pixel_bytes -= len(self._pixels.popitem(last=False)[1])
+
+    def _content_hash(self, path, st):
+        key = (path, st.st_size, st.st_mtime_ns)
+        h = self._hashes.get(key)
+        if h is None:
+            d = hashlib.blake2b(digest_size=16)
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""): d.update(block)
+            h = self._hashes[key] = d.hexdigest()
+        return h
+
+    def _make(self, path):
+        st = os.stat(path)
+        sig = (st.st_size, st.st_mtime_ns)
+        old = self._entries.get(path)
+        if old is not None and old.sig != sig: old = None            # file changed since
+        if old is not None and old.ok and os.path.exists(old.png):  # only the pixels were evicted
+            with open(old.png, "rb") as f: return old, read_png(f.read())[2]
+        decode = decoder_for(path, artifact_kind(path))
+        if decode is None: return Thumbnail(error="no decoder", sig=sig), None
+        h = self._content_hash(path, st)
+        png = os.path.join(self.cache_dir, h[:2], f"{h}-{self.size[0]}x{self.size[1]}.png")
+        if os.path.exists(png):
+            self.disk_hits += 1
+            if not self.keep_pixels: return Thumbnail(*png_size(png), png, sig=sig), None
+            with open(png, "rb") as f: w, ht, rgba = read_png(f.read())
+        else:
+            w, ht, rgba = decode(path, self.size)
+            os.makedirs(os.path.dirname(png), exist_ok=True)
+            write_png(png, w, ht, rgba)
+            self.decoded += 1
+        return Thumbnail(w, ht, png, sig=sig), (rgba if self.keep_pixels else None)
@@ -0,0 +1,245 @@
+# uploads.py — Upload stage: publish the finished video to several destinations at once
+# - Resumable multipart protocol (standin_server.py serves it; an upload gateway in front of the platforms can too):
+#     POST /uploads {destination, filename, size, part_size} -> {upload_id, part_size}
+#     GET  /uploads/{id}                                     -> {received: [part numbers], part_size, ...}
+#     PUT  /uploads/{id}/parts/{n}   (raw bytes, n from 1)   -> {part, size}
+#     POST /uploads/{id}/complete {parts: N}                 -> {url}
+# - Parts are streamed from disk BLOCK bytes at a time (never the whole file in memory), read on the default
+#   executor so a slow disk doesn't stall the event loop; PARALLEL_PARTS parts per destination are in flight
+#   and every destination runs concurrently
+# - Each request goes through ratelimit.call_with_retry under the destination's upstream ("upload:<dest>"), so a
+#   dropped connection or a 429 / 503 re-sends that one part, not the file
+# - Open sessions are kept in ~/.storymorph/uploads.json (file identity + destination -> upload id): an upload cut
+#   short by Stop, a crash or a failed run resumes with the parts the server doesn't have yet
+# - Destinations: STORYMORPH_UPLOAD_DESTINATIONS (default youtube,tiktok,instagram); server: STORYMORPH_UPLOAD_URL,
+#   else the backend URL
+#
+#   python uploads.py video.mp4 --url http://127.0.0.1:8765 --destinations youtube,tiktok,instagram
+
+import argparse, asyncio, json, os, sys, tempfile, threading, time
+from collections import deque
+from urllib.parse import quote
+
+from backend import BackendError, DEFAULT_URL, http_request
+from ratelimit import call_with_retry
+
+UPLOAD_URL = os.environ.get("STORYMORPH_UPLOAD_URL", "")
+DESTINATIONS = [d.strip() for d in os.environ.get("STORYMORPH_UPLOAD_DESTINATIONS", "youtube,tiktok,instagram").split(",")
+                if d.strip()]
+STATE_FILE = os.path.join(os.path.expanduser("~"), ".storymorph", "uploads.json")
+PART_SIZE = 8 << 20         # bytes per part (the server may pick another size)
+BLOCK = 256 << 10           # bytes per read / socket write
+PARALLEL_PARTS = 3          # parts in flight per destination
+PART_TIMEOUT = 300.0        # s for one part request
+PROGRESS_INTERVAL = 0.1     # s between progress reports
+RATE_WINDOW = 2.0           # s of history behind the "current" throughput
+SESSION_TTL = 7 * 86400     # s an unfinished session is remembered
+
+
+def fmt_mb(n): return f"{n / 1e6:.1f} MB"
+
+
+class FileSlice:
+    """`length` bytes of a file from `offset`, read BLOCK bytes at a time (off the event loop) while the request
+    body is written. on_sent(n) is called once a block has been handed to the socket."""
+
+    def __init__(self, path, offset, length, on_sent=None):
+        self.path, self.offset, self.length, self.on_sent = path, offset, length, on_sent
+        self.sent = 0
+
+    def __len__(self): return self.length
+
+    async def __aiter__(self):
+        loop = asyncio.get_running_loop()
+        f = await loop.run_in_executor(None, open, self.path, "rb")
+        try:
+            await loop.run_in_executor(None, f.seek, self.offset); left = self.length
+            while left > 0:
+                block = await loop.run_in_executor(None, f.read, min(BLOCK, left))
+                if not block: raise OSError(f"{self.path} shrank during the upload")
+                yield block
+                left -= len(block); self.sent += len(block)
+                if self.on_sent: self.on_sent(len(block))
+        finally:
+            f.close()
+
+
+class Transfer:
+    """One file going to one destination."""
+
+    def __init__(self, dest, total):
+        self.dest, self.total = dest, total
+        self.sent = self.resumed = 0          # resumed: bytes the server already had from an earlier attempt
+        self.started = time.monotonic(); self.finished = None
+        self.done = False; self.error = None; self.url = None
+        self._window = deque([(self.started, 0)])
+
+    def add(self, n): self.sent += n          # negative when a failed part is rolled back
+
+    def resume(self, n):
+        self.resumed = self.sent = n; self._window = deque([(time.monotonic(), n)])
+
+    @property
+    def elapsed(self): return (self.finished or time.monotonic()) - self.started
+
+    def rate(self):
+        """B/s over the last RATE_WINDOW seconds; the average of this run's bytes once finished."""
+        if self.finished: return (self.sent - self.resumed) / max(1e-6, self.elapsed)
+        now = time.monotonic(); w = self._window
+        w.append((now, self.sent))
+        while len(w) > 2 and now - w[0][0] > RATE_WINDOW: w.popleft()
+        t0, s0 = w[0]
+        return max(0.0, (self.sent - s0) / (now - t0)) if now > t0 else 0.0
+
+
+# ---------------- Session store (resume across runs) ----------------
+_state_lock = threading.Lock()
+
+def _load_sessions(path):
+    try:
+        with open(path, encoding="utf-8") as f: return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _store_session(path, key, session):
+    # session None forgets the key; stale sessions are pruned on every write
+    with _state_lock:
+        sessions = _load_sessions(path)
+        if session is None: sessions.pop(key, None)
+        else: sessions[key] = session
+        now = time.time()
+        sessions = {k: v for k, v in sessions.items() if now - v.get("created", now) < SESSION_TTL}
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f: json.dump(sessions, f)
+            os.replace(tmp, path)
+        except OSError:
+            pass        # not resumable across runs, but the upload itself goes on
+
+
+# ---------------- Client ----------------
+class Uploader:
+    def __init__(self, base_url, destinations=None, part_size=PART_SIZE, parallel=PARALLEL_PARTS, state_file=STATE_FILE):
+        self.base_url = base_url.rstrip("/")
+        self.destinations = list(destinations or DESTINATIONS)
+        self.part_size, self.parallel, self.state_file = part_size, parallel, state_file
+
+    async def _json(self, method, path, payload=None):
+        status, headers, body = await http_request(method, self.base_url + path, payload, timeout=PART_TIMEOUT)
+        if status >= 400: raise BackendError(status, body, headers)
+        return json.loads(body or b"{}")
+
+    async def upload(self, path, report=None, interval=PROGRESS_INTERVAL):
+        """Send `path` to every destination concurrently; returns the Transfers (failed ones have .error).
+        report(transfers) is called every `interval` seconds and once at the end."""
+        size = os.path.getsize(path)
+        transfers = [Transfer(d, size) for d in self.destinations]
+        work = asyncio.gather(*(self._send(t, path) for t in transfers))
+        try:
+            while not work.done():
+                await asyncio.wait({work}, timeout=interval)
+                if report: report(transfers)
+            work.result()
+        finally:
+            if not work.done():     # we are being cancelled: stop every destination
+                work.cancel(); work.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return transfers
+
+    async def _send(self, t, path):
+        upstream = f"upload:{t.dest}"
+        st = os.stat(path)
+        key = f"{self.base_url}|{t.dest}|{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+        try:
+            session, received = _load_sessions(self.state_file).get(key), set()
+            if session:
+                try:
+                    info = await call_with_retry(upstream, lambda: self._json("GET", f"/uploads/{session['upload_id']}"))
+                    received, session["part_size"] = set(info["received"]), info["part_size"]
+                except BackendError as e:
+                    if e.status != 404: raise
+                    session = None      # the server forgot it: start over
+            if not session:
+                res = await call_with_retry(upstream, lambda: self._json("POST", "/uploads", {
+                    "destination": t.dest, "filename": os.path.basename(path), "size": t.total,
+                    "part_size": self.part_size}))
+                session = {"upload_id": res["upload_id"], "part_size": res["part_size"], "created": time.time()}
+                _store_session(self.state_file, key, session)
+            uid, part_size = session["upload_id"], session["part_size"]
+            parts = max(1, -(-t.total // part_size))
+            t.resume(sum(min(part_size, t.total - (n - 1) * part_size) for n in received if n <= parts))
+            todo = deque(n for n in range(1, parts + 1) if n not in received)
+
+            async def worker():
+                while todo:
+                    n = todo.popleft()
+                    await call_with_retry(upstream, lambda: self._put_part(t, path, uid, n, part_size))
+
+            tasks = [asyncio.ensure_future(worker()) for _ in range(min(self.parallel, len(todo)))]
+            try: await asyncio.gather(*tasks)
+            finally:
+                for task in tasks: task.cancel()
+            res = await call_with_retry(upstream, lambda: self._json("POST", f"/uploads/{uid}/complete", {"parts": parts}))
+            t.url, t.done = res.get("url"), True
+            _store_session(self.state_file, key, None)
+        except (BackendError, OSError, asyncio.TimeoutError, KeyError, ValueError) as e:
+            t.error = f"HTTP {e.status}" if isinstance(e, BackendError) else (str(e) or type(e).__name__)
+        finally:
+            t.finished = time.monotonic()
+
+    async def _put_part(self, t, path, uid, n, part_size):
+        offset = (n - 1) * part_size
+        body = FileSlice(path, offset, min(part_size, t.total - offset), t.add)
+        try:
+            status, headers, resp = await http_request("PUT", f"{self.base_url}/uploads/{quote(uid)}/parts/{n}", body,
+                                                       {"Content-Type": "application/octet-stream"}, PART_TIMEOUT)
+        except BaseException:
+            t.add(-body.sent); raise            # the retry sends the whole part again
+        if status >= 400:
+            t.add(-body.sent); raise BackendError(status, resp, headers)
+
+
+def default_uploader(base_url=None):
+    # Client-side uploads need an upload server: STORYMORPH_UPLOAD_URL, else the backend (the stand-in serves both)
+    url = UPLOAD_URL or base_url or DEFAULT_URL
+    return Uploader(url) if url and DESTINATIONS else None
+
+
+# ---------------- CLI (offline testing / benchmarking against standin_server.py) ----------------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Upload a file to several destinations (resumable multipart).")
+    ap.add_argument("file")
+    ap.add_argument("--url", default=UPLOAD_URL or DEFAULT_URL or None, required=not (UPLOAD_URL or DEFAULT_URL),
+                    help="upload server (default $STORYMORPH_UPLOAD_URL, else $STORYMORPH_BACKEND_URL)")
+    ap.add_argument("--destinations", default=",".join(DESTINATIONS), help="comma-separated destination names")
+    ap.add_argument("--part-size", type=float, default=PART_SIZE / (1 << 20), metavar="MiB")
+    ap.add_argument("--parallel", type=int, default=PARALLEL_PARTS, help="parts in flight per destination")
+    args = ap.parse_args(argv)
+
+    up = Uploader(args.url, [d.strip() for d in args.destinations.split(",") if d.strip()],
+                  int(args.part_size * (1 << 20)), args.parallel)
+    last = [0.0]
+
+    def report(transfers):
+        if time.monotonic() - last[0] < 1.0: return
+        last[0] = time.monotonic()
+        print("  ".join(f"{t.dest} {t.sent * 100 // max(1, t.total)}% {fmt_mb(t.rate())}/s" for t in transfers),
+              file=sys.stderr)
+
+    t0 = time.monotonic()
+    try: transfers = asyncio.run(up.upload(args.file, report))
+    except KeyboardInterrupt:
+        print("interrupted; run the same command again to resume", file=sys.stderr); return 130
+    wall = time.monotonic() - t0
+    sent = 0
+    for t in transfers:
+        sent += t.sent - t.resumed
+        resumed = f", {fmt_mb(t.resumed)} resumed" if t.resumed else ""
+        print(f"{t.dest:<12}{fmt_mb(t.sent):>10} in {t.elapsed:6.2f}s  {fmt_mb(t.rate()):>9}/s{resumed}  "
+              + (t.url or "") + (f"FAILED: {t.error}" if t.error else ""))
+    print(f"total {fmt_mb(sent)} in {wall:.2f}s ({fmt_mb(sent / wall if wall else 0)}/s)")
+    return 1 if any(t.error for t in transfers) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())